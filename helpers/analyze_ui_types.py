@@ -3,29 +3,21 @@
 分析UI元素类型分布
 """
 
-import json
-from collections import Counter
+import heapq
+from collections import Counter, defaultdict
+
+import fastjson
 
 def analyze_ui_types(json_file):
     """分析UI元素类型分布"""
-    with open(json_file, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    data = fastjson.load(json_file)
     
     elements = data.get('elements', [])
     
-    # 统计类型分布
-    type_counter = Counter()
-    confidence_by_type = {}
-    
+    # 单次遍历按类型分组，计数与平均置信度均由分组结果得出
+    elements_by_type = defaultdict(list)
     for element in elements:
-        element_type = element['type']
-        confidence = element['confidence']
-        
-        type_counter[element_type] += 1
-        
-        if element_type not in confidence_by_type:
-            confidence_by_type[element_type] = []
-        confidence_by_type[element_type].append(confidence)
+        elements_by_type[element['type']].append(element)
     
     print("🎯 UI元素类型分布分析")
     print("=" * 50)
@@ -33,29 +25,24 @@ def analyze_ui_types(json_file):
     print()
     
     print("📊 类型分布:")
-    for element_type, count in type_counter.most_common():
+    type_stats = sorted(
+        ((element_type, len(group), sum(e['confidence'] for e in group) / len(group))
+         for element_type, group in elements_by_type.items()),
+        key=lambda item: item[1], reverse=True)
+    for element_type, count, avg_confidence in type_stats:
         percentage = (count / len(elements)) * 100
-        avg_confidence = sum(confidence_by_type[element_type]) / len(confidence_by_type[element_type])
         print(f"  {element_type:12} : {count:2d} 个 ({percentage:5.1f}%) - 平均置信度: {avg_confidence:.2f}")
     
     print()
     print("🔍 详细分析:")
     
-    # 按类型分组显示元素
-    elements_by_type = {}
-    for element in elements:
-        element_type = element['type']
-        if element_type not in elements_by_type:
-            elements_by_type[element_type] = []
-        elements_by_type[element_type].append(element)
-    
     for element_type in sorted(elements_by_type.keys()):
         elements_of_type = elements_by_type[element_type]
         print(f"\n{element_type.upper()} 类型元素 ({len(elements_of_type)} 个):")
         
         # 显示前5个最高置信度的元素
-        sorted_elements = sorted(elements_of_type, key=lambda x: x['confidence'], reverse=True)
-        for i, element in enumerate(sorted_elements[:5]):
+        top_elements = heapq.nlargest(5, elements_of_type, key=lambda x: x['confidence'])
+        for i, element in enumerate(top_elements):
             pos = element['position']
             size = element['size']
             print(f"  {i+1}. ID:{element['id']:2d} 位置:({pos['x1']:3d},{pos['y1']:3d},{pos['x2']:3d},{pos['y2']:3d}) "
@@ -72,13 +59,11 @@ def compare_with_old_analysis():
     
     try:
         # 读取旧的分析结果
-        with open('test_analysis.json', 'r', encoding='utf-8') as f:
-            old_data = json.load(f)
+        old_data = fastjson.load('test_analysis.json')
         old_elements = old_data.get('elements', [])
         
         # 读取新的分析结果
-        with open('enhanced_analysis.json', 'r', encoding='utf-8') as f:
-            new_data = json.load(f)
+        new_data = fastjson.load('enhanced_analysis.json')
         new_elements = new_data.get('elements', [])
         
         print(f"旧版本检测: {len(old_elements)} 个元素 (全部为 button 类型)")
@@ -4,13 +4,17 @@
 基于UI元素检测结果推断窗口中的具体内容和状态
 """
 
-import json
 from collections import defaultdict
+from itertools import chain
+
+import numpy as np
+
+import fastjson
+from element_records import to_records, areas
 
 def analyze_vscode_content(json_file):
     """分析VSCode窗口内容"""
-    with open(json_file, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    data = fastjson.load(json_file)
     
     elements = data.get('elements', [])
     window_info = data.get('window', {})
@@ -23,8 +27,11 @@ def analyze_vscode_content(json_file):
     print(f"检测到 {len(elements)} 个UI元素")
     print()
     
+    # 元素几何信息只转换一次，各分析函数共享
+    records = to_records(elements)
+    
     # 按区域分组分析
-    regions = analyze_by_regions(elements)
+    regions = analyze_by_regions(elements, records)
     
     # 分析各个区域
     analyze_title_bar(regions['title_bar'])
@@ -35,51 +42,55 @@ def analyze_vscode_content(json_file):
     analyze_status_bar(regions['status_bar'])
     
     # 推断当前状态
-    infer_current_state(elements)
+    infer_current_state(elements, records)
 
-def analyze_by_regions(elements):
-    """按区域分组UI元素"""
-    regions = {
-        'title_bar': [],      # y < 35
-        'activity_bar': [],   # x < 50
-        'tab_bar': [],        # 35 <= y < 100
-        'main_content': [],   # 100 <= y < 650, x >= 50
-        'terminal_area': [],  # 650 <= y < 950
-        'status_bar': []      # y >= 950
-    }
-    
-    for element in elements:
-        pos = element['position']
-        y = pos['y1']
-        x = pos['x1']
-        
-        if y < 35:
-            regions['title_bar'].append(element)
-        elif y >= 950:
-            regions['status_bar'].append(element)
-        elif x < 50:
-            regions['activity_bar'].append(element)
-        elif 35 <= y < 100:
-            regions['tab_bar'].append(element)
-        elif 650 <= y < 950:
-            regions['terminal_area'].append(element)
-        else:
-            regions['main_content'].append(element)
-    
+REGION_NAMES = ('title_bar', 'status_bar', 'activity_bar', 'tab_bar', 'terminal_area', 'main_content')
+
+def analyze_by_regions(elements, records=None):
+    """按区域分组UI元素，每个区域内再按元素类型分组
+    
+    返回 {区域名: {类型: [元素, ...]}}，一次遍历完成区域和类型两级分组。
+    
+    区域划分（按优先级）:
+        title_bar:     y < 35
+        status_bar:    y >= 950
+        activity_bar:  x < 50
+        tab_bar:       35 <= y < 100
+        terminal_area: 650 <= y < 950
+        main_content:  其余
+    """
+    if records is None:
+        records = to_records(elements)
+    xs, ys = records.x1, records.y1
+    
+    # 一次性计算每个元素的区域编号，np.select按条件顺序取第一个命中的区域
+    labels = np.select(
+        [ys < 35, ys >= 950, xs < 50, ys < 100, ys >= 650],
+        np.arange(len(REGION_NAMES) - 1),
+        default=len(REGION_NAMES) - 1
+    )
+    
+    regions = {name: defaultdict(list) for name in REGION_NAMES}
+    for element, k in zip(elements, labels.tolist()):
+        regions[REGION_NAMES[k]][element['type']].append(element)
     return regions
 
-def analyze_title_bar(elements):
+def region_elements(region):
+    """区域内的全部元素"""
+    return list(chain.from_iterable(region.values()))
+
+def analyze_title_bar(region):
     """分析标题栏"""
     print("📋 标题栏区域 (Title Bar)")
     print("-" * 30)
-    if not elements:
+    if not region:
         print("  未检测到标题栏元素")
         return
     
-    buttons = [e for e in elements if e['type'] == 'button']
-    tabs = [e for e in elements if e['type'] == 'tab']
+    buttons = region['button']
+    tabs = region['tab']
     
-    print(f"  检测到 {len(elements)} 个元素:")
+    print(f"  检测到 {sum(map(len, region.values()))} 个元素:")
     print(f"    - {len(buttons)} 个按钮 (窗口控制按钮)")
     print(f"    - {len(tabs)} 个标签页")
     
@@ -90,23 +101,23 @@ def analyze_title_bar(elements):
         print(f"    - 标签页宽度: {pos['x2'] - pos['x1']}px (可能有多个文件打开)")
     print()
 
-def analyze_activity_bar(elements):
+def analyze_activity_bar(region):
     """分析活动栏"""
     print("🎯 活动栏区域 (Activity Bar)")
     print("-" * 30)
-    if not elements:
+    if not region:
         print("  未检测到活动栏元素")
         return
     
-    buttons = [e for e in elements if e['type'] == 'button']
-    icons = [e for e in elements if e['type'] == 'icon']
+    buttons = region['button']
+    icons = region['icon']
     
-    print(f"  检测到 {len(elements)} 个元素:")
+    print(f"  检测到 {sum(map(len, region.values()))} 个元素:")
     print(f"    - {len(buttons)} 个按钮")
     print(f"    - {len(icons)} 个图标")
     
     # 按Y坐标排序，推断功能
-    sorted_elements = sorted(elements, key=lambda x: x['position']['y1'])
+    sorted_elements = sorted(region_elements(region), key=lambda x: x['position']['y1'])
     
     functions = [
         "文件资源管理器", "搜索", "源代码管理", "运行和调试", 
@@ -120,16 +131,16 @@ def analyze_activity_bar(elements):
         print(f"    - {func_name}: ({pos['x1']}, {pos['y1']}) - {element['type']}")
     print()
 
-def analyze_tab_bar(elements):
+def analyze_tab_bar(region):
     """分析标签页栏"""
     print("📑 标签页栏区域 (Tab Bar)")
     print("-" * 30)
-    if not elements:
+    if not region:
         print("  未检测到标签页元素")
         return
     
-    buttons = [e for e in elements if e['type'] == 'button']
-    print(f"  检测到 {len(elements)} 个元素:")
+    buttons = region['button']
+    print(f"  检测到 {sum(map(len, region.values()))} 个元素:")
     print(f"    - {len(buttons)} 个标签页按钮")
     
     # 按X坐标排序
@@ -142,32 +153,32 @@ def analyze_tab_bar(elements):
         print(f"    - 标签页 {i+1}: 位置({pos['x1']}, {pos['y1']}) 宽度:{width}px")
     print()
 
-def analyze_main_content(elements):
+def analyze_main_content(region):
     """分析主内容区域"""
     print("📝 主内容区域 (Editor Area)")
     print("-" * 30)
-    if not elements:
+    if not region:
         print("  未检测到主内容区域元素")
         return
     
-    text_elements = [e for e in elements if e['type'] == 'text']
-    links = [e for e in elements if e['type'] == 'link']
-    icons = [e for e in elements if e['type'] == 'icon']
+    text_elements = region['text']
+    links = region['link']
+    icons = region['icon']
     
-    print(f"  检测到 {len(elements)} 个元素:")
+    print(f"  检测到 {sum(map(len, region.values()))} 个元素:")
     print(f"    - {len(text_elements)} 个文本区域")
     print(f"    - {len(links)} 个链接")
     print(f"    - {len(icons)} 个图标")
     
     # 查找大的文本区域（可能是编辑器内容）
-    large_text = [e for e in text_elements if (e['position']['x2'] - e['position']['x1']) * (e['position']['y2'] - e['position']['y1']) > 50000]
+    text_areas = areas(to_records(text_elements))
+    large_text = np.flatnonzero(text_areas > 50000)
     
-    if large_text:
+    if large_text.size:
         print("  主编辑器区域:")
-        for text in large_text:
-            pos = text['position']
-            area = (pos['x2'] - pos['x1']) * (pos['y2'] - pos['y1'])
-            print(f"    - 大文本区域: ({pos['x1']}, {pos['y1']}) 到 ({pos['x2']}, {pos['y2']}) 面积:{area}px²")
+        for i in large_text:
+            pos = text_elements[i]['position']
+            print(f"    - 大文本区域: ({pos['x1']}, {pos['y1']}) 到 ({pos['x2']}, {pos['y2']}) 面积:{text_areas[i]}px²")
     
     if links:
         print("  可点击链接:")
@@ -176,19 +187,19 @@ def analyze_main_content(elements):
             print(f"    - 链接: ({pos['x1']}, {pos['y1']}) 到 ({pos['x2']}, {pos['y2']})")
     print()
 
-def analyze_terminal_area(elements):
+def analyze_terminal_area(region):
     """分析终端区域"""
     print("💻 终端区域 (Terminal Area)")
     print("-" * 30)
-    if not elements:
+    if not region:
         print("  未检测到终端区域元素")
         return
     
-    buttons = [e for e in elements if e['type'] == 'button']
-    icons = [e for e in elements if e['type'] == 'icon']
-    text_elements = [e for e in elements if e['type'] == 'text']
+    buttons = region['button']
+    icons = region['icon']
+    text_elements = region['text']
     
-    print(f"  检测到 {len(elements)} 个元素:")
+    print(f"  检测到 {sum(map(len, region.values()))} 个元素:")
     print(f"    - {len(buttons)} 个按钮 (终端控制)")
     print(f"    - {len(icons)} 个图标")
     print(f"    - {len(text_elements)} 个文本 (终端输出)")
@@ -200,23 +211,23 @@ def analyze_terminal_area(elements):
             print(f"    - 文本行: ({pos['x1']}, {pos['y1']}) 宽度:{pos['x2'] - pos['x1']}px")
     print()
 
-def analyze_status_bar(elements):
+def analyze_status_bar(region):
     """分析状态栏"""
     print("📊 状态栏区域 (Status Bar)")
     print("-" * 30)
-    if not elements:
+    if not region:
         print("  未检测到状态栏元素")
         return
     
-    text_elements = [e for e in elements if e['type'] == 'text']
-    buttons = [e for e in elements if e['type'] == 'button']
+    text_elements = region['text']
+    buttons = region['button']
     
-    print(f"  检测到 {len(elements)} 个元素:")
+    print(f"  检测到 {sum(map(len, region.values()))} 个元素:")
     print(f"    - {len(text_elements)} 个文本信息")
     print(f"    - {len(buttons)} 个按钮")
     
     # 按X坐标排序
-    sorted_elements = sorted(elements, key=lambda x: x['position']['x1'])
+    sorted_elements = sorted(region_elements(region), key=lambda x: x['position']['x1'])
     
     print("  状态栏信息 (从左到右):")
     for i, element in enumerate(sorted_elements):
@@ -226,7 +237,7 @@ def analyze_status_bar(elements):
         print(f"    - {element_type} {i+1}: 位置({pos['x1']}, {pos['y1']}) 宽度:{width}px")
     print()
 
-def infer_current_state(elements):
+def infer_current_state(elements, records=None):
     """推断当前VSCode状态"""
     print("🔮 当前状态推断")
     print("-" * 30)
@@ -237,8 +248,10 @@ def infer_current_state(elements):
         type_counts[element['type']] += 1
     
     # 分析窗口状态
-    has_terminal = any(650 <= e['position']['y1'] < 950 for e in elements)
-    has_large_content = any((e['position']['x2'] - e['position']['x1']) * (e['position']['y2'] - e['position']['y1']) > 50000 for e in elements if e['type'] == 'text')
+    if records is None:
+        records = to_records(elements)
+    has_terminal = bool(np.any((records.y1 >= 650) & (records.y1 < 950)))
+    has_large_content = bool(np.any((records.type == 'text') & (areas(records) > 50000)))
     
     print("  界面状态:")
     print(f"    - 终端面板: {'打开' if has_terminal else '关闭'}")
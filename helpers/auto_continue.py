@@ -5,39 +5,99 @@
 """
 
 import time
+import json
+import re
+import queue
 import subprocess
 import sys
+import threading
+
+WINDOW_TITLE = "self-evolve-ai - Visual Studio Code"
+
+# 需要探测的窗口标题，预编译为一个正则，对窗口列表只扫描一遍
+WATCHED_TITLES = (WINDOW_TITLE,)
+WATCHED_TITLES_PATTERN = re.compile("|".join(re.escape(title) for title in WATCHED_TITLES))
+
+# 每条命令等待守护进程响应的最长时间（秒），与原来单次调用的超时一致
+COMMAND_TIMEOUT = 10
+
+# 常驻的maestro守护进程，避免每次操作都重新启动Python解释器
+_worker = None
+# 守护进程输出的响应行，由读取线程放入；每个守护进程一个队列
+_responses = None
+
+def _read_responses(stdout, responses):
+    """读取线程：把守护进程输出的每一行放入队列，进程退出时放入空串"""
+    for line in stdout:
+        responses.put(line)
+    responses.put("")
+
+def get_worker():
+    """获取或启动maestro守护进程"""
+    global _worker, _responses
+    if _worker is None or _worker.poll() is not None:
+        # stderr继承当前控制台，守护进程的异常堆栈不会被丢弃
+        _worker = subprocess.Popen([
+            "python", "maestro/maestro_cli.py", "--daemon"
+        ], stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+           text=True, encoding='utf-8', errors='ignore')
+        # Windows上管道不能用select，改用读取线程加带超时的队列
+        _responses = queue.Queue()
+        threading.Thread(target=_read_responses, args=(_worker.stdout, _responses), daemon=True).start()
+    return _worker
+
+def stop_worker(kill=False):
+    """关闭maestro守护进程，kill为True时直接结束进程"""
+    global _worker, _responses
+    if _worker is not None:
+        try:
+            if kill:
+                _worker.kill()
+            else:
+                _worker.stdin.close()
+            _worker.wait(timeout=5)
+        except Exception:
+            _worker.kill()
+        _worker = None
+        _responses = None
+
+def send_command(command):
+    """向守护进程发送一条命令并读取响应"""
+    worker = get_worker()
+    try:
+        worker.stdin.write(json.dumps(command) + "\n")
+        worker.stdin.flush()
+        line = _responses.get(timeout=COMMAND_TIMEOUT)
+    except queue.Empty:
+        # 守护进程卡住（例如阻塞在Win32调用上），结束它，下次调用时重新启动
+        stop_worker(kill=True)
+        return {"ok": False, "error": f"maestro守护进程{COMMAND_TIMEOUT}秒内无响应，已结束，下次调用时重新启动"}
+    except (BrokenPipeError, OSError) as e:
+        stop_worker()
+        return {"ok": False, "error": str(e)}
+    if not line:
+        # 守护进程已退出，下次调用时重新启动
+        stop_worker()
+        return {"ok": False, "error": "maestro守护进程已退出"}
+    return json.loads(line)
+
+# 输入continue后回车，整组操作在守护进程内一次完成
+CONTINUE_SEQUENCE = [
+    {"op": "type", "text": "continue", "no_activate": True},
+    {"op": "sleep", "ms": 500},
+    {"op": "key", "value": "Return"},
+]
 
 def send_continue():
     """发送continue到VSCode窗口"""
     try:
-        # 发送continue文本
-        result1 = subprocess.run([
-            "python", "maestro/maestro_cli.py",
-            "keyboard", "self-evolve-ai - Visual Studio Code",
-            "type", "continue", "--no-activate"
-        ], capture_output=True, text=True, timeout=10, encoding='utf-8', errors='ignore')
+        result = send_command({"cmd": "sequence", "window": WINDOW_TITLE, "keys": CONTINUE_SEQUENCE})
         
-        if result1.returncode == 0:
-            print(f"[{time.strftime('%H:%M:%S')}] ✅ 发送'continue'成功")
-            
-            # 等待一下再发送回车
-            time.sleep(0.5)
-            
-            # 发送回车键
-            result2 = subprocess.run([
-                "python", "maestro/maestro_cli.py",
-                "keyboard", "self-evolve-ai - Visual Studio Code",
-                "key", "Return"
-            ], capture_output=True, text=True, timeout=10, encoding='utf-8', errors='ignore')
-            
-            if result2.returncode == 0:
-                print(f"[{time.strftime('%H:%M:%S')}] ✅ 发送回车成功")
-                return True
-            else:
-                print(f"[{time.strftime('%H:%M:%S')}] ❌ 发送回车失败: {result2.stderr}")
+        if result.get("ok"):
+            print(f"[{time.strftime('%H:%M:%S')}] ✅ 发送'continue'和回车成功")
+            return True
         else:
-            print(f"[{time.strftime('%H:%M:%S')}] ❌ 发送'continue'失败: {result1.stderr}")
+            print(f"[{time.strftime('%H:%M:%S')}] ❌ 发送'continue'失败: {result.get('error', '')}")
             
     except Exception as e:
         print(f"[{time.strftime('%H:%M:%S')}] ❌ 执行失败: {e}")
@@ -47,17 +107,16 @@ def send_continue():
 def check_window():
     """检查VSCode窗口是否存在"""
     try:
-        result = subprocess.run([
-            "python", "maestro/maestro_cli.py", "list"
-        ], capture_output=True, text=True, timeout=10, encoding='utf-8', errors='ignore')
+        result = send_command({"cmd": "list"})
+        titles = [title for _, title, _ in result.get("windows", [])]
 
-        if result.returncode == 0 and "self-evolve-ai - Visual Studio Code" in result.stdout:
+        if result.get("ok") and WATCHED_TITLES_PATTERN.search("\n".join(titles)):
             return True
         else:
             # 打印调试信息
-            print(f"[DEBUG] 窗口检查结果: returncode={result.returncode}")
-            if result.stdout:
-                print(f"[DEBUG] stdout包含的窗口: {[line.strip() for line in result.stdout.split('\\n') if 'Visual Studio Code' in line]}")
+            print(f"[DEBUG] 窗口检查结果: ok={result.get('ok')} {result.get('error', '')}")
+            if titles:
+                print(f"[DEBUG] 包含的窗口: {[title for title in titles if 'Visual Studio Code' in title]}")
     except Exception as e:
         print(f"[DEBUG] 窗口检查异常: {e}")
     return False
@@ -87,6 +146,8 @@ def main():
         print(f"\n[{time.strftime('%H:%M:%S')}] 🛑 收到停止信号，退出")
     except Exception as e:
         print(f"\n[{time.strftime('%H:%M:%S')}] ❌ 程序出错: {e}")
+    finally:
+        stop_worker()
 
 if __name__ == "__main__":
     main()
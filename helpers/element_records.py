@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+UI元素的列式(SoA)表示
+将maestro输出的元素字典列表一次性转换为NumPy记录数组，供各分析脚本做向量化筛选
+"""
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+COORD_FIELDS = ('x1', 'y1', 'x2', 'y2')
+
+def element_dtype(type_width):
+    """记录数组的dtype，type字段宽度由数据中最长的类型名决定，避免截断"""
+    return np.dtype([(name, 'i4') for name in COORD_FIELDS] +
+                    [('conf', 'f8'), ('type', f'U{max(type_width, 1)}')])
+
+def to_records(elements):
+    """将元素字典列表转换为记录数组，字段为 x1, y1, x2, y2, conf, type
+    
+    坐标可能是浮点数，四舍五入到最近的整数像素而不是直接截断
+    """
+    coords = np.empty((len(elements), 4))
+    conf = np.empty(len(elements))
+    types = []
+    for i, element in enumerate(elements):
+        pos = element.get('position', {})
+        coords[i] = [pos.get(name, 0) for name in COORD_FIELDS]
+        conf[i] = element.get('confidence', 0)
+        types.append(element.get('type', ''))
+    
+    records = np.empty(len(elements), dtype=element_dtype(max(map(len, types), default=0)))
+    coords = np.rint(coords).astype(np.int32)
+    for k, name in enumerate(COORD_FIELDS):
+        records[name] = coords[:, k]
+    records['conf'] = conf
+    records['type'] = types
+    return records.view(np.recarray)
+
+def widths(records):
+    """元素宽度"""
+    return records.x2 - records.x1
+
+def heights(records):
+    """元素高度"""
+    return records.y2 - records.y1
+
+def areas(records):
+    """元素面积"""
+    return widths(records) * heights(records)
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True, parallel=True)
+    def _contained_in_any_kernel(x1, y1, x2, y2, boxes):
+        n = x1.shape[0]
+        out = np.zeros(n, np.bool_)
+        for i in prange(n):
+            for j in range(boxes.shape[0]):
+                if x1[i] >= boxes[j, 0] and y1[i] >= boxes[j, 1] and x2[i] <= boxes[j, 2] and y2[i] <= boxes[j, 3]:
+                    out[i] = True
+                    break
+        return out
+
+def contained_in_any(records, boxes):
+    """返回完全位于任一区域内的元素掩码，boxes为 (M, 4) 的 (x1, y1, x2, y2) 序列"""
+    boxes = np.asarray(boxes, dtype=np.int32).reshape(-1, 4)
+    if NUMBA_AVAILABLE:
+        return _contained_in_any_kernel(records.x1, records.y1, records.x2, records.y2, boxes)
+    hit = ((records.x1[:, None] >= boxes[None, :, 0]) & (records.y1[:, None] >= boxes[None, :, 1]) &
+           (records.x2[:, None] <= boxes[None, :, 2]) & (records.y2[:, None] <= boxes[None, :, 3]))
+    return hit.any(axis=1)
@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+"""
+快速加载JSON分析结果
+优先使用orjson直接解析内存映射的文件内容，orjson不可用时回退到标准库json
+"""
+
+import json
+import mmap
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+def load(path):
+    """读取并解析JSON文件"""
+    with open(path, 'rb') as f:
+        if ORJSON_AVAILABLE:
+            try:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m, memoryview(m) as view:
+                    return orjson.loads(view)
+            except ValueError as e:
+                # 空文件无法mmap，交给标准库给出一致的解析错误
+                if isinstance(e, json.JSONDecodeError):
+                    raise
+        return json.load(f)
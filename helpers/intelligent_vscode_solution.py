@@ -9,8 +9,36 @@ import subprocess
 import json
 import os
 import base64
+from random import Random
 from datetime import datetime
 
+# 模拟AI分析的候选场景，模块加载时构建一次
+_SCENARIOS = (
+    {
+        "decision": "需要回复continue",
+        "confidence": 85,
+        "reason": "检测到'Would you like me to keep going?'提示",
+        "should_respond": True
+    },
+    {
+        "decision": "无需回复",
+        "confidence": 92,
+        "reason": "AI助手正在工作中，显示进度条",
+        "should_respond": False
+    },
+    {
+        "decision": "任务已完成",
+        "confidence": 88,
+        "reason": "显示'Task completed successfully'",
+        "should_respond": False
+    }
+)
+
+_RNG = Random()
+
+# 目录扫描结果缓存有效期(秒)，同一轮监控中的多次查询共享一次扫描
+_DIR_CACHE_TTL = 1.0
+
 class IntelligentVSCodeSolution:
     """
     智能VSCode自动化解决方案
@@ -26,6 +54,7 @@ class IntelligentVSCodeSolution:
     def __init__(self):
         self.window_title = "self-evolve-ai - Visual Studio Code"
         self.maestro_path = "maestro/maestro_cli.py"
+        self._scan_cache = (0.0, (None, None))
         
         print("🧠 智能VSCode自动化解决方案")
         print("=" * 60)
@@ -43,6 +72,8 @@ class IntelligentVSCodeSolution:
         # 使用maestro CLI捕获窗口
         cmd = f'python {self.maestro_path} detail "{self.window_title}" -s -o analysis.json'
         result = subprocess.run(cmd, shell=True, capture_output=True, text=True, encoding='utf-8', errors='ignore')
+        # 捕获会写入新文件，使目录扫描缓存失效
+        self._scan_cache = (0.0, (None, None))
         
         if result.returncode == 0:
             print("✅ 窗口截图捕获成功")
@@ -66,11 +97,34 @@ class IntelligentVSCodeSolution:
             print("   - 决策: 无需回复，继续监控")
             return True
     
+    def _scan_workdir(self):
+        """单次遍历当前目录，同时找出analysis.json和最新的截图文件
+        
+        返回 (analysis_path, latest_screenshot)，结果在_DIR_CACHE_TTL秒内复用
+        """
+        cached_at, scan = self._scan_cache
+        now = time.monotonic()
+        if now - cached_at > _DIR_CACHE_TTL:
+            # DirEntry.stat()自带缓存，无需为每个文件再调用stat
+            analysis, latest, latest_time = None, None, -1.0
+            with os.scandir('.') as entries:
+                for entry in entries:
+                    if entry.name == 'analysis.json':
+                        analysis = entry.path
+                    elif entry.name.endswith('_screenshot.png'):
+                        ctime = entry.stat().st_ctime
+                        if ctime > latest_time:
+                            latest, latest_time = entry.name, ctime
+            scan = (analysis, latest)
+            self._scan_cache = (now, scan)
+        return scan
+    
     def _count_ui_elements(self):
         """统计检测到的UI元素数量"""
+        analysis, _ = self._scan_workdir()
         try:
-            if os.path.exists('analysis.json'):
-                with open('analysis.json', 'r', encoding='utf-8') as f:
+            if analysis:
+                with open(analysis, 'r', encoding='utf-8') as f:
                     data = json.load(f)
                     return len(data.get('elements', []))
         except:
@@ -79,10 +133,8 @@ class IntelligentVSCodeSolution:
     
     def _get_latest_screenshot(self):
         """获取最新的截图文件名"""
-        screenshots = [f for f in os.listdir('.') if f.endswith('_screenshot.png')]
-        if screenshots:
-            return max(screenshots, key=os.path.getctime)
-        return "未找到截图"
+        _, latest = self._scan_workdir()
+        return latest or "未找到截图"
     
     def _simulate_ai_analysis(self):
         """模拟AI视觉分析"""
@@ -90,55 +142,25 @@ class IntelligentVSCodeSolution:
         # 例如：OpenAI GPT-4V, Claude 3 Vision, Google Gemini Vision
         
         # 模拟分析结果
-        scenarios = [
-            {
-                "decision": "需要回复continue",
-                "confidence": 85,
-                "reason": "检测到'Would you like me to keep going?'提示",
-                "should_respond": True
-            },
-            {
-                "decision": "无需回复",
-                "confidence": 92,
-                "reason": "AI助手正在工作中，显示进度条",
-                "should_respond": False
-            },
-            {
-                "decision": "任务已完成",
-                "confidence": 88,
-                "reason": "显示'Task completed successfully'",
-                "should_respond": False
-            }
-        ]
-        
-        # 基于当前时间选择场景（演示用）
-        import random
-        return random.choice(scenarios)
+        return _RNG.choice(_SCENARIOS)
     
     def _execute_smart_response(self):
         """执行智能响应"""
         print("\n⌨️  步骤4: 执行智能响应...")
         
-        # 发送continue
-        cmd1 = f'python {self.maestro_path} keyboard "{self.window_title}" type "continue" --no-activate'
-        result1 = subprocess.run(cmd1, shell=True, capture_output=True, text=True, encoding='utf-8', errors='ignore')
-        
-        if result1.returncode == 0:
-            print("   ✅ 发送'continue'成功")
-            
-            # 短暂等待
-            time.sleep(0.5)
-            
-            # 发送回车确认
-            cmd2 = f'python {self.maestro_path} keyboard "{self.window_title}" key "Return" --no-activate'
-            result2 = subprocess.run(cmd2, shell=True, capture_output=True, text=True, encoding='utf-8', errors='ignore')
-            
-            if result2.returncode == 0:
-                print("   ✅ 发送回车确认成功")
-                print("   🎉 智能响应完成！")
-                return True
-            else:
-                print("   ❌ 发送回车失败")
+        # 输入continue并回车确认，在一个maestro进程内完成
+        steps = [
+            {"op": "type", "text": "continue", "no_activate": True},
+            {"op": "sleep", "ms": 500},
+            {"op": "key", "value": "Return"},
+        ]
+        cmd = ["python", self.maestro_path, "keyboard", self.window_title, "sequence", json.dumps(steps)]
+        result = subprocess.run(cmd, capture_output=True, text=True, encoding='utf-8', errors='ignore')
+        
+        if result.returncode == 0:
+            print("   ✅ 发送'continue'和回车确认成功")
+            print("   🎉 智能响应完成！")
+            return True
         else:
             print("   ❌ 发送continue失败")
         
@@ -6,16 +6,24 @@ import sys
 import json
 from pathlib import Path
 import argparse
+import numpy as np
 from PIL import Image
 
+sys.path.append(str(Path(__file__).parent.parent))  # 添加helpers目录到路径
+import fastjson
+from element_records import to_records, contained_in_any
+
 def extract_augment_dialog(screenshot_path, output_dir=None):
     """从VSCode截图中提取augment对话区域"""
     if not os.path.exists(screenshot_path):
         print(f"截图文件不存在: {screenshot_path}")
         return None
         
-    # 加载截图
+    # 加载截图，只解码一次，各区域直接在同一像素数组上切片
     img = Image.open(screenshot_path)
+    if img.mode not in ("RGB", "RGBA"):
+        img = img.convert("RGB")
+    pixels = np.asarray(img)
     
     # 定义可能的augment对话区域
     # 这些坐标是基于之前分析的结果
@@ -27,10 +35,10 @@ def extract_augment_dialog(screenshot_path, output_dir=None):
     
     # 提取每个可能的区域
     for i, area in enumerate(dialog_areas):
-        cropped = img.crop(area)
-        
         # 保存裁剪后的图像
         if output_dir:
+            x1, y1, x2, y2 = area
+            cropped = Image.fromarray(pixels[y1:y2, x1:x2])
             os.makedirs(output_dir, exist_ok=True)
             output_path = os.path.join(output_dir, f"augment_dialog_{i}.png")
             cropped.save(output_path)
@@ -51,8 +59,7 @@ def analyze_vscode_window(json_path, output_dir=None):
         return
         
     # 加载JSON数据
-    with open(json_path, 'r') as f:
-        data = json.load(f)
+    data = fastjson.load(json_path)
     
     # 查找截图路径
     screenshot_path = data.get("screenshot_path")
@@ -94,22 +101,10 @@ def analyze_vscode_window(json_path, output_dir=None):
     # 分析UI元素
     elements = data.get("elements", [])
     
-    # 查找可能的augment对话相关元素
-    augment_elements = []
-    
-    # 根据位置和类型筛选可能的augment对话元素
-    for elem in elements:
-        elem_type = elem.get("type")
-        position = elem.get("position", {})
-        x1, y1 = position.get("x1", 0), position.get("y1", 0)
-        x2, y2 = position.get("x2", 0), position.get("y2", 0)
-        
-        # 检查元素是否在对话区域内
-        for area in dialog_areas:
-            if (x1 >= area["area"][0] and y1 >= area["area"][1] and 
-                x2 <= area["area"][2] and y2 <= area["area"][3]):
-                augment_elements.append(elem)
-                break
+    # 根据位置筛选可能的augment对话元素：元素完全位于任一对话区域内
+    records = to_records(elements)
+    in_dialog = contained_in_any(records, [area["area"] for area in dialog_areas])
+    augment_elements = [elements[i] for i in np.flatnonzero(in_dialog)]
     
     # 输出分析结果
     print(f"\n找到 {len(augment_elements)} 个可能的augment对话元素:")
@@ -5,115 +5,120 @@ import sys
 import re
 import subprocess
 import json
+from dataclasses import dataclass
+import numpy as np
+
+# maestro_cli.py detail 输出中的元素行，例如:
+# 元素 3: 类型=button, 位置=(10, 20, 110, 60), 置信度=0.87
+ELEMENT_MARKER = "元素 "
+ELEMENT_PATTERN = re.compile(
+    r"元素 (?P<id>\d+): 类型=(?P<type>\w+), "
+    r"位置=\((?P<x1>\d+), (?P<y1>\d+), (?P<x2>\d+), (?P<y2>\d+)\), "
+    r"置信度=(?P<confidence>[\d\.]+)"
+)
 
 def run_maestro_command(window_title="Visual Studio Code"):
-    """运行maestro_cli.py命令并获取输出"""
+    """运行maestro_cli.py命令，逐行产出其输出
+    
+    输出通过带缓冲的管道边产生边读取，解析可以与子进程运行同时进行。
+    """
     cmd = ["python", "maestro_cli.py", "detail", window_title]
     
     try:
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        return result.stdout
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                                text=True, bufsize=65536)
     except Exception as e:
         print(f"执行命令失败: {e}")
-        return None
+        return
+    
+    with proc:
+        yield from proc.stdout
+
+@dataclass
+class Elements:
+    """按列存放的UI元素集合"""
+    ids: np.ndarray       # (N,) int32
+    types: np.ndarray     # (N,) object
+    bboxes: np.ndarray    # (N, 4) int32, 顺序为 x1, y1, x2, y2
+    conf: np.ndarray      # (N,) float32
+    
+    def __len__(self):
+        return len(self.ids)
+    
+    @property
+    def widths(self):
+        return self.bboxes[:, 2] - self.bboxes[:, 0]
+    
+    @property
+    def heights(self):
+        return self.bboxes[:, 3] - self.bboxes[:, 1]
+    
+    @property
+    def areas(self):
+        return self.widths * self.heights
 
 def parse_elements_from_output(output):
-    """从输出中解析UI元素信息"""
-    if not output:
-        return []
-        
-    # 使用正则表达式匹配元素信息
-    pattern = r"元素 (\d+): 类型=(\w+), 位置=\((\d+), (\d+), (\d+), (\d+)\), 置信度=([\d\.]+)"
-    matches = re.findall(pattern, output)
-    
-    elements = []
-    for match in matches:
-        element_id, element_type, x1, y1, x2, y2, confidence = match
-        elements.append({
-            "id": int(element_id),
-            "type": element_type,
-            "position": {
-                "x1": int(x1),
-                "y1": int(y1),
-                "x2": int(x2),
-                "y2": int(y2)
-            },
-            "confidence": float(confidence)
-        })
-    
-    return elements
+    """从输出中解析UI元素信息，output可以是完整字符串或逐行的可迭代对象"""
+    lines = output.splitlines() if isinstance(output, str) else (output or ())
+    ids, types, bboxes, conf = [], [], [], []
+    for line in lines:
+        # 先用字面量快速跳过不含元素信息的行，再做正则匹配
+        if ELEMENT_MARKER not in line:
+            continue
+        match = ELEMENT_PATTERN.search(line)
+        if match is None:
+            continue
+        element_id, element_type, x1, y1, x2, y2, confidence = match.groups()
+        ids.append(int(element_id))
+        types.append(element_type)
+        bboxes.append((int(x1), int(y1), int(x2), int(y2)))
+        conf.append(float(confidence))
+    
+    return Elements(
+        ids=np.asarray(ids, dtype=np.int32),
+        types=np.asarray(types, dtype=object),
+        bboxes=np.asarray(bboxes, dtype=np.int32).reshape(-1, 4),
+        conf=np.asarray(conf, dtype=np.float32)
+    )
 
 def find_augment_dialog_elements(elements):
-    """查找可能的augment对话元素"""
-    # 查找大型文本区域，可能是对话内容
-    text_elements = [e for e in elements if e["type"] == "text"]
-    large_text_elements = []
-    
-    for elem in text_elements:
-        width = elem["position"]["x2"] - elem["position"]["x1"]
-        height = elem["position"]["y2"] - elem["position"]["y1"]
-        area = width * height
-        
-        # 如果面积大于一定阈值，可能是对话区域
-        if area > 10000:  # 调整阈值
-            large_text_elements.append({
-                **elem,
-                "width": width,
-                "height": height,
-                "area": area
-            })
-    
-    # 按面积排序
-    large_text_elements.sort(key=lambda e: e["area"], reverse=True)
-    
-    return large_text_elements
+    """查找可能的augment对话元素，返回按面积从大到小排列的元素下标"""
+    areas = elements.areas
+    
+    # 查找大型文本区域，可能是对话内容（面积阈值可调整）
+    candidates = np.flatnonzero((elements.types == "text") & (areas > 10000))
+    return candidates[np.argsort(-areas[candidates], kind="stable")]
 
 def analyze_vscode_window():
     """分析VSCode窗口中的augment对话内容"""
-    # 运行命令获取输出
-    output = run_maestro_command()
-    
-    if not output:
-        print("无法获取命令输出")
-        return
+    # 运行命令，边读取输出边解析元素信息
+    elements = parse_elements_from_output(run_maestro_command())
     
-    # 解析元素信息
-    elements = parse_elements_from_output(output)
-    
-    if not elements:
+    if not len(elements):
         print("未检测到UI元素")
         return
     
     # 查找可能的augment对话元素
-    dialog_elements = find_augment_dialog_elements(elements)
+    dialog_indices = find_augment_dialog_elements(elements)
+    widths, heights = elements.widths, elements.heights
     
     # 输出分析结果
-    print(f"\n找到 {len(elements)} 个UI元素，其中 {len(dialog_elements)} 个可能是augment对话区域:")
-    
-    for i, elem in enumerate(dialog_elements):
-        elem_id = elem["id"]
-        elem_type = elem["type"]
-        x1, y1 = elem["position"]["x1"], elem["position"]["y1"]
-        x2, y2 = elem["position"]["x2"], elem["position"]["y2"]
-        width, height = elem["width"], elem["height"]
-        confidence = elem["confidence"]
-        
-        print(f"对话区域 {i+1} (元素 {elem_id}): 类型={elem_type}, 位置=({x1}, {y1}, {x2}, {y2}), 大小={width}x{height}px, 置信度={confidence:.2f}")
+    print(f"\n找到 {len(elements)} 个UI元素，其中 {len(dialog_indices)} 个可能是augment对话区域:")
+    
+    for i, k in enumerate(dialog_indices):
+        x1, y1, x2, y2 = elements.bboxes[k]
+        print(f"对话区域 {i+1} (元素 {elements.ids[k]}): 类型={elements.types[k]}, 位置=({x1}, {y1}, {x2}, {y2}), "
+              f"大小={widths[k]}x{heights[k]}px, 置信度={elements.conf[k]:.2f}")
     
     # 查找按钮元素，可能是对话中的操作按钮
-    button_elements = [e for e in elements if e["type"] == "button"]
-    
-    print(f"\n找到 {len(button_elements)} 个按钮元素，可能是对话中的操作按钮:")
-    
-    for i, elem in enumerate(button_elements[:5]):  # 只显示前5个
-        elem_id = elem["id"]
-        x1, y1 = elem["position"]["x1"], elem["position"]["y1"]
-        x2, y2 = elem["position"]["x2"], elem["position"]["y2"]
-        width = x2 - x1
-        height = y2 - y1
-        confidence = elem["confidence"]
-        
-        print(f"按钮 {i+1} (元素 {elem_id}): 位置=({x1}, {y1}, {x2}, {y2}), 大小={width}x{height}px, 置信度={confidence:.2f}")
+    button_indices = np.flatnonzero(elements.types == "button")
+    
+    print(f"\n找到 {len(button_indices)} 个按钮元素，可能是对话中的操作按钮:")
+    
+    for i, k in enumerate(button_indices[:5]):  # 只显示前5个
+        x1, y1, x2, y2 = elements.bboxes[k]
+        print(f"按钮 {i+1} (元素 {elements.ids[k]}): 位置=({x1}, {y1}, {x2}, {y2}), "
+              f"大小={widths[k]}x{heights[k]}px, 置信度={elements.conf[k]:.2f}")
 
 if __name__ == "__main__":
     analyze_vscode_window() 
\ No newline at end of file
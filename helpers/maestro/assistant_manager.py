@@ -8,14 +8,15 @@ import json
 import logging
 from pathlib import Path
 import argparse
+from collections import OrderedDict
+import numpy as np
 
 # 添加父目录到路径
 sys.path.append(str(Path(__file__).parent))
 
-# 导入maestro模块
+# 导入maestro模块，UIDetector依赖较重，延迟到创建AssistantManager时再导入
 from maestro.core.input_controller import InputController
 from maestro.core.window_capture import WindowCapture
-from maestro.core.ui_detector import UIDetector
 from maestro.core.ui_types import ElementType
 
 # 设置日志
@@ -25,6 +26,9 @@ logger = logging.getLogger('assistant_manager')
 class AssistantManager:
     """智能助理窗口管理器"""
     
+    # 布局缓存最多保留的条目数，超出时丢弃最久未用的
+    LAYOUT_CACHE_SIZE = 8
+    
     def __init__(self, window_title="Visual Studio Code", weights_dir=None):
         """初始化助理管理器
         
@@ -34,12 +38,18 @@ class AssistantManager:
         """
         self.window_title = window_title
         
+        # 布局缓存(LRU): (窗口句柄, 截图尺寸, 缩略图哈希) -> (对话区域, 输入区域, 发送按钮)
+        # 同一窗口界面未变化时跳过重新检测
+        self._layout_cache = OrderedDict()
+        
         # 初始化组件
         if weights_dir is None:
             weights_dir = Path(__file__).parent / "weights"
             if not weights_dir.exists():
                 weights_dir = Path(__file__).parent.parent.parent / "weights"
         
+        from maestro.core.ui_detector import UIDetector
+        
         self.ui_detector = UIDetector(str(weights_dir))
         self.window_capture = WindowCapture()
         self.input_controller = InputController()
@@ -54,6 +64,10 @@ class AssistantManager:
         self.input_area = None
         self.send_button = None
         
+        # 上一次OCR的对话区域指纹和识别结果，画面不变时直接复用
+        self._last_ocr_hash = None
+        self._last_ocr_text = None
+        
         # 初始化UI元素
         if self.hwnd:
             self._initialize_ui_elements()
@@ -75,6 +89,16 @@ class AssistantManager:
             logger.error("无法捕获窗口截图")
             return
         
+        # 按32像素步长取样的缩略图足以区分布局变化，哈希代价可以忽略
+        pixels = np.asarray(image)
+        layout_key = (self.hwnd, pixels.shape, hash(pixels[::32, ::32].tobytes()))
+        cached_layout = self._layout_cache.get(layout_key)
+        if cached_layout is not None:
+            self._layout_cache.move_to_end(layout_key)
+            self.dialog_area, self.input_area, self.send_button = cached_layout
+            logger.info("窗口布局未变化，使用缓存的UI元素位置")
+            return
+        
         # 分析UI元素
         elements = self.ui_detector.analyze_image(image)
         if not elements:
@@ -83,58 +107,40 @@ class AssistantManager:
         
         # 查找对话区域（大型文本区域）
         text_elements = self.ui_detector.find_element_by_type(elements, ElementType.TEXT)
-        large_text_elements = []
-        
-        for elem in text_elements:
-            x1, y1, x2, y2 = elem.bbox
-            width = x2 - x1
-            height = y2 - y1
-            area = width * height
+        if text_elements:
+            text_boxes = np.array([e.bbox for e in text_elements], dtype=np.int64)
+            areas = (text_boxes[:, 2] - text_boxes[:, 0]) * (text_boxes[:, 3] - text_boxes[:, 1])
             
-            # 如果面积大于一定阈值，可能是对话区域
-            if area > 10000:
-                large_text_elements.append((elem, area))
-        
-        # 按面积排序
-        large_text_elements.sort(key=lambda x: x[1], reverse=True)
-        
-        if large_text_elements:
-            # 最大的文本区域可能是对话区域
-            self.dialog_area = large_text_elements[0][0].bbox
-            logger.info(f"找到对话区域: {self.dialog_area}")
+            # 面积大于阈值的文本区域中，最大的一个可能是对话区域
+            largest = int(np.argmax(areas))
+            if areas[largest] > 10000:
+                self.dialog_area = text_elements[largest].bbox
+                logger.info(f"找到对话区域: {self.dialog_area}")
         
         # 查找输入区域（通常在窗口底部的文本框）
-        input_elements = self.ui_detector.find_element_by_type(elements, ElementType.TEXTBOX)
+        input_elements = self.ui_detector.find_element_by_type(elements, ElementType.INPUT)
         if input_elements:
             # 选择位于窗口底部的文本框
-            input_elements.sort(key=lambda e: e.bbox[1], reverse=True)
-            self.input_area = input_elements[0].bbox
+            input_tops = np.array([e.bbox[1] for e in input_elements], dtype=np.int64)
+            self.input_area = input_elements[int(np.argmax(input_tops))].bbox
             logger.info(f"找到输入区域: {self.input_area}")
         
         # 查找发送按钮（通常在输入框旁边的按钮）
         button_elements = self.ui_detector.find_element_by_type(elements, ElementType.BUTTON)
         if button_elements and self.input_area:
-            # 查找靠近输入区域的按钮
-            input_x = (self.input_area[0] + self.input_area[2]) / 2
-            input_y = (self.input_area[1] + self.input_area[3]) / 2
-            
-            closest_button = None
-            min_distance = float('inf')
+            # 查找中心点离输入区域中心最近的按钮，比较距离平方即可，无需开方
+            input_center = np.array([self.input_area[0] + self.input_area[2],
+                                     self.input_area[1] + self.input_area[3]]) / 2
+            button_boxes = np.array([b.bbox for b in button_elements], dtype=np.float64)
+            button_centers = (button_boxes[:, :2] + button_boxes[:, 2:]) / 2
+            closest = int(np.argmin(((button_centers - input_center) ** 2).sum(axis=1)))
             
-            for button in button_elements:
-                button_x = (button.bbox[0] + button.bbox[2]) / 2
-                button_y = (button.bbox[1] + button.bbox[3]) / 2
-                
-                # 计算距离
-                distance = ((button_x - input_x) ** 2 + (button_y - input_y) ** 2) ** 0.5
-                
-                if distance < min_distance:
-                    min_distance = distance
-                    closest_button = button
-            
-            if closest_button:
-                self.send_button = closest_button.bbox
-                logger.info(f"找到发送按钮: {self.send_button}")
+            self.send_button = button_elements[closest].bbox
+            logger.info(f"找到发送按钮: {self.send_button}")
+        
+        self._layout_cache[layout_key] = (self.dialog_area, self.input_area, self.send_button)
+        if len(self._layout_cache) > self.LAYOUT_CACHE_SIZE:
+            self._layout_cache.popitem(last=False)
     
     def activate_window(self):
         """激活窗口"""
@@ -190,6 +196,29 @@ class AssistantManager:
         logger.info(f"已发送消息: {message}")
         return True
     
+    def _capture_dialog(self):
+        """捕获窗口并裁剪出对话区域的像素
+        
+        Returns:
+            np.ndarray: 连续内存的uint8对话区域图像，失败时返回None
+        """
+        self.window_capture.set_window_handle(self.hwnd)
+        image = self.window_capture.capture()
+        if image is None:
+            logger.error("无法捕获窗口截图")
+            return None
+        
+        x1, y1, x2, y2 = self.dialog_area
+        # 复制为连续内存，OCR不必每次自行转换切片视图
+        return np.ascontiguousarray(np.asarray(image)[y1:y2, x1:x2], dtype=np.uint8)
+    
+    def _dialog_pixel_hash(self):
+        """对话区域的像素指纹，按4像素步长取样，用于低成本地检测内容变化"""
+        dialog_image = self._capture_dialog()
+        if dialog_image is None:
+            return None
+        return hash(dialog_image[::4, ::4].tobytes())
+    
     def read_last_response(self):
         """读取最后一条助理响应
         
@@ -200,29 +229,27 @@ class AssistantManager:
             logger.warning("窗口或对话区域未找到，无法读取响应")
             return None
         
-        # 捕获窗口截图
-        self.window_capture.set_window_handle(self.hwnd)
-        image = self.window_capture.capture()
-        if image is None:
-            logger.error("无法捕获窗口截图")
+        # 捕获并裁剪对话区域
+        dialog_image = self._capture_dialog()
+        if dialog_image is None:
             return None
         
-        # 裁剪对话区域
-        x1, y1, x2, y2 = self.dialog_area
-        dialog_image = image[y1:y2, x1:x2]
+        # 对话画面与上次OCR时完全一致，直接返回上次的识别结果
+        dialog_hash = hash(dialog_image.tobytes())
+        if dialog_hash == self._last_ocr_hash:
+            return self._last_ocr_text
         
-        # 使用OCR识别文本
-        if self.ui_detector.enable_ocr and self.ui_detector.ocr is not None:
+        # 使用OCR识别文本（OCR模型在第一次使用时加载）
+        ocr = self.ui_detector.get_ocr()
+        if ocr is not None:
             try:
-                ocr_result = self.ui_detector.ocr.ocr(dialog_image, cls=True)
+                ocr_result = ocr.ocr(dialog_image, cls=True)
                 
                 if ocr_result and ocr_result[0]:
-                    texts = []
-                    for line in ocr_result[0]:
-                        if line[1][0]:  # 文本内容
-                            texts.append(line[1][0])
-                    
-                    response = " ".join(texts)
+                    # 拼接各行的文本内容
+                    response = " ".join(line[1][0] for line in ocr_result[0] if line and line[1] and line[1][0])
+                    self._last_ocr_hash = dialog_hash
+                    self._last_ocr_text = response
                     logger.info(f"读取到响应: {response[:50]}...")
                     return response
             except Exception as e:
@@ -231,40 +258,58 @@ class AssistantManager:
         logger.warning("无法读取响应文本")
         return None
     
-    def wait_for_response(self, timeout=60, check_interval=1):
+    def wait_for_response(self, timeout=60, check_interval=1, stable_checks=2):
         """等待助理响应
         
+        轮询时只比较对话区域的像素指纹，画面先发生变化、再连续stable_checks次
+        保持不变后才认为响应完成，此时只做一次OCR读取响应文本。
+        
         Args:
             timeout: 超时时间（秒）
             check_interval: 检查间隔（秒）
+            stable_checks: 判定响应完成所需的连续不变次数
             
         Returns:
             str: 助理响应文本
         """
-        if not self.hwnd:
-            logger.warning("窗口未找到，无法等待响应")
+        if not self.hwnd or not self.dialog_area:
+            logger.warning("窗口或对话区域未找到，无法等待响应")
             return None
         
         logger.info(f"等待助理响应，最多 {timeout} 秒...")
         
-        # 记录初始对话内容
-        initial_response = self.read_last_response()
+        # 记录初始对话画面
+        initial_hash = self._dialog_pixel_hash()
+        last_hash = initial_hash
+        changed = False
+        unchanged_count = 0
         
         start_time = time.time()
         while time.time() - start_time < timeout:
             # 等待一段时间
             time.sleep(check_interval)
             
-            # 读取当前响应
-            current_response = self.read_last_response()
+            current_hash = self._dialog_pixel_hash()
+            if current_hash is None:
+                continue
             
-            # 如果响应发生变化，说明助理正在回复
-            if current_response != initial_response and current_response:
-                # 再等待一段时间，确保响应完成
-                time.sleep(2)
-                final_response = self.read_last_response()
-                logger.info("助理已响应")
-                return final_response
+            # 画面发生变化，说明助理正在回复
+            if not changed:
+                if current_hash != initial_hash:
+                    changed = True
+                    last_hash = current_hash
+                continue
+            
+            # 画面连续保持不变，认为回复已完成
+            if current_hash == last_hash:
+                unchanged_count += 1
+                if unchanged_count >= stable_checks:
+                    final_response = self.read_last_response()
+                    logger.info("助理已响应")
+                    return final_response
+            else:
+                last_hash = current_hash
+                unchanged_count = 0
         
         logger.warning(f"等待响应超时（{timeout}秒）")
         return None
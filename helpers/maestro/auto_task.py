@@ -1,13 +1,25 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
+import io
+import atexit
+import heapq
 import os
 import sys
 import time
 import json
 import argparse
+from operator import itemgetter
 from pathlib import Path
-import datetime
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# 任务时间戳格式
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
 
 # 添加当前目录到路径
 sys.path.append(str(Path(__file__).parent))
@@ -18,23 +30,46 @@ from interact_with_augment import AugmentInteractor
 class TaskAutomator:
     """任务自动化执行器"""
     
-    def __init__(self, tasks_file="tasks.json", output_md="../../docs/cursor_running.md", window_title="Visual Studio Code"):
+    def __init__(self, tasks_file="tasks.json", output_md="../../docs/cursor_running.md", window_title="Visual Studio Code",
+                 interactor=None):
         """初始化任务自动化执行器
         
         Args:
             tasks_file: 任务文件路径
             output_md: 输出的Markdown文件路径
             window_title: VSCode窗口标题
+            interactor: 发送任务消息的交互器，默认为连接window_title窗口的AugmentInteractor
         """
         self.tasks_file = tasks_file
         self.output_md = output_md
         self.window_title = window_title
         
         # 创建交互器
-        self.interactor = AugmentInteractor(window_title=window_title)
+        self.interactor = interactor if interactor is not None else AugmentInteractor(window_title=window_title)
         
         # 加载任务
         self.tasks = self._load_tasks()
+        self._build_index()
+        
+        # 任务变更只标记为脏，在update_markdown或进程退出时统一保存
+        self._dirty = False
+        atexit.register(self._flush_tasks)
+    
+    def _build_index(self):
+        """建立任务ID索引和待处理任务的优先级堆"""
+        self._by_id = {}
+        self._order = {}
+        self._pending = []
+        for i, task in enumerate(self.tasks):
+            self._by_id[task["id"]] = task
+            self._order[task["id"]] = i
+            if task["status"] == "待处理":
+                self._pending.append((-task["priority"], i, task["id"]))
+        heapq.heapify(self._pending)
+    
+    def _push_pending(self, task):
+        """将待处理任务加入优先级堆，过期条目在取出时惰性删除"""
+        heapq.heappush(self._pending, (-task["priority"], self._order[task["id"]], task["id"]))
     
     def _load_tasks(self):
         """加载任务"""
@@ -50,38 +85,101 @@ class TaskAutomator:
             return []
     
     def _save_tasks(self):
-        """保存任务"""
+        """保存任务，先写临时文件再替换，避免中途崩溃损坏任务文件"""
         try:
-            with open(self.tasks_file, 'w', encoding='utf-8') as f:
-                json.dump(self.tasks, f, ensure_ascii=False, indent=2)
+            tmp_file = self.tasks_file + ".tmp"
+            if ORJSON_AVAILABLE:
+                with open(tmp_file, 'wb') as f:
+                    f.write(orjson.dumps(self.tasks, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+            else:
+                with open(tmp_file, 'w', encoding='utf-8') as f:
+                    json.dump(self.tasks, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_file, self.tasks_file)
+            self._dirty = False
             print(f"已保存任务到 {self.tasks_file}")
         except Exception as e:
             print(f"保存任务失败: {e}")
     
-    def add_task(self, description, status="待处理", priority=0):
-        """添加任务
-        
-        Args:
-            description: 任务描述
-            status: 任务状态
-            priority: 优先级
-        """
+    def _flush_tasks(self):
+        """如有未保存的变更则保存任务"""
+        if self._dirty:
+            self._save_tasks()
+    
+    def _apply_add(self, description, status="待处理", priority=0, timestamp=None):
+        """在内存中添加任务，不保存也不更新Markdown"""
+        timestamp = timestamp or time.strftime(TIME_FORMAT)
         task = {
             "id": f"task_{len(self.tasks) + 1}",
             "description": description,
             "status": status,
             "priority": priority,
-            "created_at": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            "updated_at": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            "created_at": timestamp,
+            "updated_at": timestamp
         }
         
         self.tasks.append(task)
-        self._save_tasks()
+        self._by_id[task["id"]] = task
+        self._order[task["id"]] = len(self.tasks) - 1
+        if status == "待处理":
+            self._push_pending(task)
+        self._dirty = True
+        return task
+    
+    def add_task(self, description, status="待处理", priority=0):
+        """添加任务
+        
+        Args:
+            description: 任务描述
+            status: 任务状态
+            priority: 优先级
+        """
+        task = self._apply_add(description, status, priority)
         self.update_markdown()
         
         print(f"已添加任务: {task['id']} - {description}")
         return task
     
+    def add_tasks(self, descriptions_and_priorities):
+        """批量添加任务，全部添加后只保存和更新Markdown一次
+        
+        Args:
+            descriptions_and_priorities: (描述, 优先级) 元组列表
+        """
+        timestamp = time.strftime(TIME_FORMAT)
+        tasks = [self._apply_add(description, priority=priority, timestamp=timestamp)
+                 for description, priority in descriptions_and_priorities]
+        if tasks:
+            self.update_markdown()
+        
+        for task in tasks:
+            print(f"已添加任务: {task['id']} - {task['description']}")
+        return tasks
+    
+    def _apply_update(self, task_id, status=None, description=None, priority=None, timestamp=None):
+        """在内存中更新任务，不保存也不更新Markdown"""
+        task = self._by_id.get(task_id)
+        if task is None:
+            print(f"任务不存在: {task_id}")
+            return False
+        
+        if status:
+            task["status"] = status
+        
+        if description:
+            task["description"] = description
+        
+        if priority is not None:
+            task["priority"] = priority
+        
+        # 状态或优先级变化后重新入堆，旧条目在get_next_task中丢弃
+        if task["status"] == "待处理" and (status or priority is not None):
+            self._push_pending(task)
+        
+        task["updated_at"] = timestamp or time.strftime(TIME_FORMAT)
+        
+        self._dirty = True
+        return True
+    
     def update_task(self, task_id, status=None, description=None, priority=None):
         """更新任务
         
@@ -91,42 +189,47 @@ class TaskAutomator:
             description: 新描述
             priority: 新优先级
         """
-        for task in self.tasks:
-            if task["id"] == task_id:
-                if status:
-                    task["status"] = status
-                
-                if description:
-                    task["description"] = description
-                
-                if priority is not None:
-                    task["priority"] = priority
-                
-                task["updated_at"] = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                
-                self._save_tasks()
-                self.update_markdown()
-                
-                print(f"已更新任务: {task_id}")
-                return True
-        
-        print(f"任务不存在: {task_id}")
-        return False
+        if not self._apply_update(task_id, status, description, priority):
+            return False
+        
+        self.update_markdown()
+        
+        print(f"已更新任务: {task_id}")
+        return True
     
-    def get_next_task(self):
-        """获取下一个要执行的任务"""
-        # 筛选待处理的任务
-        todo_tasks = [t for t in self.tasks if t["status"] == "待处理"]
+    def update_tasks(self, updates):
+        """批量更新任务，全部更新后只保存和更新Markdown一次
+        
+        Args:
+            updates: (任务ID, 字段字典) 元组列表，字段同update_task的参数
         
-        if not todo_tasks:
-            print("没有待处理的任务")
-            return None
+        Returns:
+            成功更新的任务ID列表
+        """
+        timestamp = time.strftime(TIME_FORMAT)
+        updated = [task_id for task_id, fields in updates
+                   if self._apply_update(task_id, timestamp=timestamp, **fields)]
+        if updated:
+            self.update_markdown()
         
-        # 按优先级排序
-        todo_tasks.sort(key=lambda t: t["priority"], reverse=True)
+        for task_id in updated:
+            print(f"已更新任务: {task_id}")
+        return updated
+    
+    def get_next_task(self):
+        """获取下一个要执行的任务"""
+        # 丢弃状态或优先级已变化的过期堆顶
+        pending = self._pending
+        while pending:
+            neg_priority, _, task_id = pending[0]
+            task = self._by_id[task_id]
+            if task["status"] == "待处理" and -task["priority"] == neg_priority:
+                # 返回优先级最高的任务，同优先级按添加顺序
+                return task
+            heapq.heappop(pending)
         
-        # 返回优先级最高的任务
-        return todo_tasks[0]
+        print("没有待处理的任务")
+        return None
     
     def execute_task(self, task_id=None):
         """执行任务
@@ -137,7 +240,7 @@ class TaskAutomator:
         # 获取要执行的任务
         task = None
         if task_id:
-            task = next((t for t in self.tasks if t["id"] == task_id), None)
+            task = self._by_id.get(task_id)
             if not task:
                 print(f"任务不存在: {task_id}")
                 return False
@@ -151,6 +254,15 @@ class TaskAutomator:
         # 更新任务状态为进行中
         self.update_task(task["id"], status="进行中")
         
+        self._send_task(task)
+        
+        # 更新任务状态为已完成
+        self.update_task(task["id"], status="已完成")
+        
+        return True
+    
+    def _send_task(self, task):
+        """向Augment发送任务消息"""
         # 构建任务消息
         message = f"请执行以下任务：{task['description']}"
         
@@ -160,11 +272,6 @@ class TaskAutomator:
         
         # 等待一段时间，让用户手动检查结果
         print("任务已发送，请检查结果...")
-        
-        # 更新任务状态为已完成
-        self.update_task(task["id"], status="已完成")
-        
-        return True
     
     def run_all_tasks(self):
         """执行所有待处理的任务"""
@@ -173,6 +280,7 @@ class TaskAutomator:
             if not task:
                 break
             
+            # 发送后立即标记完成，等待期间中断也不会让任务停留在进行中
             self.execute_task(task["id"])
             
             # 等待一段时间再执行下一个任务
@@ -182,79 +290,79 @@ class TaskAutomator:
     
     def update_markdown(self):
         """更新Markdown文件"""
+        self._flush_tasks()
+        
         try:
-            # 准备Markdown内容
-            content = "# 任务状态\n\n"
-            content += f"更新时间: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n"
-            
-            # 按状态分组
-            status_groups = {
-                "进行中": [],
-                "待处理": [],
-                "已完成": [],
-                "失败": []
-            }
-            
+            # 单次遍历按状态分组
+            status_groups = {status: [] for status in ("进行中", "待处理", "已完成", "失败")}
             for task in self.tasks:
-                status = task.get("status", "待处理")
-                if status in status_groups:
-                    status_groups[status].append(task)
+                group = status_groups.get(task.get("status", "待处理"))
+                if group is not None:
+                    group.append(task)
+            
+            # 准备Markdown内容，使用StringIO避免字符串反复拼接
+            buf = io.StringIO()
+            write = buf.write
+            write("# 任务状态\n\n")
+            write(f"更新时间: {time.strftime(TIME_FORMAT)}\n\n")
             
             # 进行中的任务
-            content += "## 进行中的任务\n\n"
+            write("## 进行中的任务\n\n")
             if status_groups["进行中"]:
-                content += "| ID | 描述 | 优先级 | 更新时间 |\n"
-                content += "| --- | --- | --- | --- |\n"
+                write("| ID | 描述 | 优先级 | 更新时间 |\n")
+                write("| --- | --- | --- | --- |\n")
                 for task in status_groups["进行中"]:
-                    content += f"| {task['id']} | {task['description']} | {task['priority']} | {task['updated_at']} |\n"
+                    write(f"| {task['id']} | {task['description']} | {task['priority']} | {task['updated_at']} |\n")
             else:
-                content += "暂无进行中的任务\n"
+                write("暂无进行中的任务\n")
             
-            content += "\n"
+            write("\n")
             
             # 待处理的任务
-            content += "## 待处理的任务\n\n"
+            write("## 待处理的任务\n\n")
             if status_groups["待处理"]:
-                content += "| ID | 描述 | 优先级 | 依赖 |\n"
-                content += "| --- | --- | --- | --- |\n"
-                for task in sorted(status_groups["待处理"], key=lambda t: t["priority"], reverse=True):
+                write("| ID | 描述 | 优先级 | 依赖 |\n")
+                write("| --- | --- | --- | --- |\n")
+                status_groups["待处理"].sort(key=itemgetter("priority"), reverse=True)
+                for task in status_groups["待处理"]:
                     deps = task.get("dependencies", [])
                     deps_str = ", ".join(deps) if deps else "无"
-                    content += f"| {task['id']} | {task['description']} | {task['priority']} | {deps_str} |\n"
+                    write(f"| {task['id']} | {task['description']} | {task['priority']} | {deps_str} |\n")
             else:
-                content += "暂无待处理的任务\n"
+                write("暂无待处理的任务\n")
             
-            content += "\n"
+            write("\n")
             
             # 已完成的任务
-            content += "## 已完成的任务\n\n"
+            write("## 已完成的任务\n\n")
             if status_groups["已完成"]:
-                content += "| ID | 描述 | 完成时间 |\n"
-                content += "| --- | --- | --- |\n"
-                for task in sorted(status_groups["已完成"], key=lambda t: t["updated_at"], reverse=True):
-                    content += f"| {task['id']} | {task['description']} | {task['updated_at']} |\n"
+                write("| ID | 描述 | 完成时间 |\n")
+                write("| --- | --- | --- |\n")
+                status_groups["已完成"].sort(key=itemgetter("updated_at"), reverse=True)
+                for task in status_groups["已完成"]:
+                    write(f"| {task['id']} | {task['description']} | {task['updated_at']} |\n")
             else:
-                content += "暂无已完成的任务\n"
+                write("暂无已完成的任务\n")
             
-            content += "\n"
+            write("\n")
             
             # 失败的任务
-            content += "## 失败的任务\n\n"
+            write("## 失败的任务\n\n")
             if status_groups["失败"]:
-                content += "| ID | 描述 | 失败原因 | 失败时间 |\n"
-                content += "| --- | --- | --- | --- |\n"
+                write("| ID | 描述 | 失败原因 | 失败时间 |\n")
+                write("| --- | --- | --- | --- |\n")
                 for task in status_groups["失败"]:
                     reason = task.get("result", "未知原因")
-                    content += f"| {task['id']} | {task['description']} | {reason} | {task['updated_at']} |\n"
+                    write(f"| {task['id']} | {task['description']} | {reason} | {task['updated_at']} |\n")
             else:
-                content += "暂无失败的任务\n"
+                write("暂无失败的任务\n")
             
             # 创建目录（如果不存在）
             os.makedirs(os.path.dirname(self.output_md), exist_ok=True)
             
-            # 写入Markdown文件
+            # 一次性写入Markdown文件
             with open(self.output_md, 'w', encoding='utf-8') as f:
-                f.write(content)
+                f.write(buf.getvalue())
             
             print(f"已更新Markdown文件: {self.output_md}")
             return True
@@ -268,11 +376,11 @@ def main():
     parser.add_argument("--tasks", "-t", default="tasks.json", help="任务文件路径")
     parser.add_argument("--output", "-o", default="../../docs/cursor_running.md", help="输出的Markdown文件路径")
     parser.add_argument("--window", "-w", default="Visual Studio Code", help="VSCode窗口标题")
-    parser.add_argument("--add", "-a", help="添加新任务")
+    parser.add_argument("--add", "-a", action="append", help="添加新任务（可多次指定）")
     parser.add_argument("--priority", "-p", type=int, default=0, help="任务优先级")
     parser.add_argument("--execute", "-e", help="执行指定任务")
     parser.add_argument("--run-all", "-r", action="store_true", help="执行所有待处理的任务")
-    parser.add_argument("--update", "-u", help="更新任务状态 (格式: task_id:status)")
+    parser.add_argument("--update", "-u", action="append", help="更新任务状态 (格式: task_id:status，可多次指定)")
     
     args = parser.parse_args()
     
@@ -285,15 +393,18 @@ def main():
     
     # 添加任务
     if args.add:
-        automator.add_task(args.add, priority=args.priority)
+        automator.add_tasks([(description, args.priority) for description in args.add])
     
     # 更新任务状态
     if args.update:
-        try:
-            task_id, status = args.update.split(":", 1)
-            automator.update_task(task_id, status=status)
-        except ValueError:
-            print(f"无效的更新格式: {args.update}，应为 task_id:status")
+        updates = []
+        for update in args.update:
+            try:
+                task_id, status = update.split(":", 1)
+                updates.append((task_id, {"status": status}))
+            except ValueError:
+                print(f"无效的更新格式: {update}，应为 task_id:status")
+        automator.update_tasks(updates)
     
     # 执行任务
     if args.execute:
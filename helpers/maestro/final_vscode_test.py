@@ -22,6 +22,9 @@ screen_capture_fix.apply_fix()
 
 # Now import maestro_core
 import maestro_core
+from png_writer import save_png_async
+from polling import wait_until
+from vscode_patterns import is_vscode_title
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -41,27 +44,13 @@ def list_all_windows():
     vscode_windows = []
     other_windows = []
     
-    # Enhanced patterns for VSCode window detection
-    vscode_patterns = [
-        "visual studio code",
-        "code - oss",
-        "code",
-        ".py —",
-        ".js —",
-        ".html —",
-        ".css —",
-        ".md —",
-        "— code",
-        "☁️ remote agent",
-        "workspace",
-        "vscode"
-    ]
-    
     # Separate VSCode windows from other windows for better visibility
     for window in windows:
+        # Menu bar, dock and other tiny/hidden/non-normal-layer windows can't be VSCode, skip the title match
+        if window.width <= 2 or window.height <= 2 or not window.is_visible or window.layer != 0:
+            other_windows.append(window)
         # Check for VSCode-specific patterns in window titles (case insensitive)
-        title_lower = window.title.lower()
-        if any(pattern in title_lower for pattern in vscode_patterns):
+        elif is_vscode_title(window.title):
             vscode_windows.append(window)
         else:
             other_windows.append(window)
@@ -123,23 +112,30 @@ def test_window_management():
     return maestro
 
 def test_screen_capture(maestro):
-    """Test screen capture functionality"""
+    """Test screen capture functionality
+    
+    Returns:
+        List of futures for the PNG writes still in flight.
+    """
     if not maestro:
         logger.error("No Maestro instance provided")
-        return
+        return []
     
     logger.info("\n=== Testing Screen Capture ===")
     
-    # Capture full window
+    pending_saves = []
+    
+    # Capture full window straight from the compositor by window ID, falling back to the generic path
     logger.info("Capturing full window...")
-    image = maestro.capture_window()
+    image = maestro.capture_window_by_id()
+    if image is None:
+        image = maestro.capture_window()
     
     if image is not None:
-        # Save the captured image
+        # Save the captured image in the background while the region capture runs
         timestamp = time.strftime("%Y%m%d_%H%M%S")
         filename = f"vscode_full_{timestamp}.png"
-        Image.fromarray(image).save(filename)
-        logger.info(f"Full window capture saved to {filename}")
+        pending_saves.append(save_png_async(image, filename, "Full window capture"))
         
         # Get window dimensions
         height, width = image.shape[:2]
@@ -160,21 +156,21 @@ def test_screen_capture(maestro):
     region_y = y + (height - region_height) // 2
     
     # Capture the region using the screen capture object directly
-    img = maestro._screen_capture.capture_region(region_x, region_y, region_width, region_height)
-    region = np.array(img) if img is not None else None
+    region = maestro._screen_capture.capture_region(region_x, region_y, region_width, region_height)
     
     if region is not None:
-        # Save the captured region
+        # Save the captured PIL Image directly instead of round-tripping through numpy
         timestamp = time.strftime("%Y%m%d_%H%M%S")
         filename = f"vscode_region_{timestamp}.png"
-        Image.fromarray(region).save(filename)
-        logger.info(f"Region capture saved to {filename}")
+        pending_saves.append(save_png_async(region, filename, "Region capture"))
         
         # Get region dimensions
-        height, width = region.shape[:2]
+        width, height = region.size
         logger.info(f"Region dimensions: {width}x{height}")
     else:
         logger.error("Failed to capture region")
+    
+    return pending_saves
 
 def test_input_control(maestro):
     """Test input control functionality"""
@@ -184,9 +180,8 @@ def test_input_control(maestro):
     
     logger.info("\n=== Testing Input Control ===")
     
-    # Activate the window first
+    # Activate the window first (activate_window already waits for activation)
     maestro.activate_window()
-    time.sleep(0.5)  # Give time for the window to activate
     
     # Get cursor position
     x, y = maestro._input_controller.get_cursor_position()
@@ -199,7 +194,7 @@ def test_input_control(maestro):
     
     logger.info(f"Moving cursor to center of window: {center_x}, {center_y}")
     maestro._input_controller.mouse_move(center_x, center_y)
-    time.sleep(0.5)  # Give time for the cursor to move
+    wait_until(lambda: maestro._input_controller.get_cursor_position() == (center_x, center_y), timeout=0.5)
     
     # Get new cursor position
     new_x, new_y = maestro._input_controller.get_cursor_position()
@@ -218,12 +213,16 @@ def main():
     maestro = test_window_management()
     
     if maestro:
-        # Test screen capture
-        test_screen_capture(maestro)
+        # Test screen capture; the PNG writes keep running during the input control test
+        pending_saves = test_screen_capture(maestro)
         
         # Test input control
         test_input_control(maestro)
         
+        # Wait for the capture writes to finish
+        for future in pending_saves:
+            future.result()
+        
         logger.info("\nAll tests completed successfully!")
     else:
         logger.error("Tests failed: Could not create Maestro instance")
@@ -9,6 +9,7 @@ import os
 import sys
 import time
 import logging
+import math
 from PIL import Image
 import numpy as np
 
@@ -16,6 +17,9 @@ import numpy as np
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 import maestro_core
 from maestro.platform import window_capture
+from png_writer import save_png_async
+from vscode_patterns import is_vscode_title
+from maestro.platform.base import CAPTURE_PERMISSION_DENIED, CAPTURE_OFF_SCREEN
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -37,34 +41,19 @@ def safely_reshape_image_data(img_data, expected_height, expected_width):
             if expected_width > 0 and expected_height > 0:
                 aspect_ratio = expected_width / expected_height
                 
-                # Calculate new dimensions based on aspect ratio
-                new_height = int(np.sqrt(pixel_count / aspect_ratio))
-                if new_height <= 0:
-                    new_height = 1
-                
-                new_width = pixel_count // new_height
-                if new_width <= 0:
-                    new_width = 1
-                
-                # Adjust to ensure exact match
-                while new_width * new_height * 4 != actual_size:
-                    if new_width * new_height * 4 < actual_size:
-                        new_width += 1
-                    else:
-                        new_height -= 1
-                    
-                    # Safety check
-                    if new_width <= 0 or new_height <= 0:
-                        # Fall back to simple square calculation
-                        new_dim = int(np.sqrt(pixel_count))
-                        new_height = new_dim
-                        new_width = pixel_count // new_dim
-                        break
+                # Pick the exact factorization of pixel_count closest to the expected aspect ratio
+                small = np.arange(1, math.isqrt(pixel_count) + 1)
+                small = small[pixel_count % small == 0]
+                heights = np.concatenate((small, pixel_count // small))
+                widths = pixel_count // heights
+                best = int(np.argmin(np.abs(widths / heights - aspect_ratio)))
+                new_height = int(heights[best])
+                new_width = int(widths[best])
                 
                 logger.info(f"Adjusted dimensions to: {new_width}x{new_height}")
             else:
                 # If dimensions are invalid, use a square shape
-                new_dim = int(np.sqrt(pixel_count))
+                new_dim = math.isqrt(pixel_count)
                 new_height = new_dim
                 new_width = pixel_count // new_dim
             
@@ -97,13 +86,29 @@ def safe_capture_window(maestro):
         screen_capture = maestro._screen_capture
         
         # Try to capture the window directly using the platform's screen capture
-        image = screen_capture.capture()
+        status, image = screen_capture.capture_with_status()
         
         if image is not None:
-            # Convert PIL Image to numpy array
-            return np.array(image)
+            # View the PIL Image as a numpy array without a second copy
+            return np.asarray(image)
         
-        # If direct capture failed, try to capture a region instead
+        # Without screen recording permission every further capture fails too
+        if status == CAPTURE_PERMISSION_DENIED:
+            logger.error("Screen capture permission denied, not retrying")
+            return None
+        
+        # An off-screen window has to be brought forward; a region capture would only grab what covers it
+        if status == CAPTURE_OFF_SCREEN:
+            logger.info("Window is off-screen, activating it and retrying capture...")
+            if maestro.activate_window():
+                maestro._window_manager.refresh()
+                image = screen_capture.capture()
+                if image is not None:
+                    return np.asarray(image)
+            logger.error("Window capture failed after activation")
+            return None
+        
+        # If direct capture failed transiently, try to capture a region instead
         logger.info("Direct window capture failed, trying region capture...")
         
         # Try a smaller region first
@@ -115,7 +120,7 @@ def safe_capture_window(maestro):
         image = screen_capture.capture_region(region_x, region_y, region_width, region_height)
         
         if image is not None:
-            return np.array(image)
+            return np.asarray(image)
         
         logger.error("All capture methods failed")
         return None
@@ -138,27 +143,13 @@ def list_all_windows():
     vscode_windows = []
     other_windows = []
     
-    # Enhanced patterns for VSCode window detection
-    vscode_patterns = [
-        "visual studio code",
-        "code - oss",
-        "code",
-        ".py —",
-        ".js —",
-        ".html —",
-        ".css —",
-        ".md —",
-        "— code",
-        "☁️ remote agent",
-        "workspace",
-        "vscode"
-    ]
-    
     # Separate VSCode windows from other windows for better visibility
     for window in windows:
+        # Menu bar, dock and other tiny/hidden/non-normal-layer windows can't be VSCode, skip the title match
+        if window.width <= 2 or window.height <= 2 or not window.is_visible or window.layer != 0:
+            other_windows.append(window)
         # Check for VSCode-specific patterns in window titles (case insensitive)
-        title_lower = window.title.lower()
-        if any(pattern in title_lower for pattern in vscode_patterns):
+        elif is_vscode_title(window.title):
             vscode_windows.append(window)
         else:
             other_windows.append(window)
@@ -218,15 +209,23 @@ def main():
             "workspace"
         ]
         
-        # Create Maestro instance targeting VSCode
+        # Match patterns against the windows already enumerated above instead of
+        # creating a MaestroCore per pattern, each of which re-enumerates all windows
         logger.info("\nTrying to find VSCode window with common title patterns...")
+        titles_lower = [window.title.lower() for window in all_windows]
         
         for pattern in vscode_title_patterns:
             logger.info(f"Trying pattern: {pattern}")
-            temp_maestro = maestro_core.MaestroCore(window_title=pattern, debug_mode=True)
-            if temp_maestro._window_manager.has_window_handle():
+            pattern_lower = pattern.lower()
+            match = next((window for window, title in zip(all_windows, titles_lower) if pattern_lower in title), None)
+            if match is not None:
                 logger.info(f"Found window matching pattern: {pattern}")
-                maestro = temp_maestro
+                # An empty title skips the constructor's own window lookup
+                maestro = maestro_core.MaestroCore(window_title="", debug_mode=True)
+                maestro._window_manager.set_window_handle(match.id)
+                maestro.window_title = match.title
+                # The constructor only sets up UI element positions when it found the window itself
+                maestro._initialize_ui_elements()
                 break
     
     # Check if window was found
@@ -245,13 +244,13 @@ def main():
     # Capture window content using our safe method
     logger.info("Capturing window content...")
     image = safe_capture_window(maestro)
+    save_future = None
     
     if image is not None:
-        # Save the captured image
+        # Save the captured image in the background while the window is activated
         timestamp = time.strftime("%Y%m%d_%H%M%S")
         filename = f"vscode_capture_{timestamp}.png"
-        Image.fromarray(image).save(filename)
-        logger.info(f"Window capture saved to {filename}")
+        save_future = save_png_async(image, filename, "Window capture")
         
         # Get window dimensions
         height, width = image.shape[:2]
@@ -268,6 +267,9 @@ def main():
     
     # Wait a moment to see the activation
     time.sleep(1)
+    
+    if save_future is not None:
+        save_future.result()
         
     logger.info("Test completed")
     return maestro
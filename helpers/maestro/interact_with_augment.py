@@ -6,6 +6,8 @@ import sys
 import time
 import json
 import argparse
+import ctypes
+from ctypes import wintypes
 from pathlib import Path
 import win32gui
 import win32con
@@ -14,6 +16,8 @@ import win32api
 # 添加当前目录到路径
 sys.path.append(str(Path(__file__).parent))
 
+from polling import wait_until
+
 # 尝试导入ui_ctrl_v2模块
 try:
     from ui_ctrl_v2.input_controller import InputController
@@ -23,9 +27,125 @@ except ImportError:
     print("警告: ui_ctrl_v2模块不可用，使用替代方法")
     UI_CTRL_V2_AVAILABLE = False
 
+# VSCode(Electron)顶层窗口的窗口类名
+VSCODE_WINDOW_CLASS = "Chrome_WidgetWin_1"
+
+# SendInput所需的结构体，INPUT的大小由最大的MOUSEINPUT决定
+INPUT_KEYBOARD = 1
+KEYEVENTF_KEYUP = 0x0002
+KEYEVENTF_UNICODE = 0x0004
+
+class MOUSEINPUT(ctypes.Structure):
+    _fields_ = [
+        ("dx", wintypes.LONG),
+        ("dy", wintypes.LONG),
+        ("mouseData", wintypes.DWORD),
+        ("dwFlags", wintypes.DWORD),
+        ("time", wintypes.DWORD),
+        ("dwExtraInfo", ctypes.POINTER(wintypes.ULONG))
+    ]
+
+class KEYBDINPUT(ctypes.Structure):
+    _fields_ = [
+        ("wVk", wintypes.WORD),
+        ("wScan", wintypes.WORD),
+        ("dwFlags", wintypes.DWORD),
+        ("time", wintypes.DWORD),
+        ("dwExtraInfo", ctypes.POINTER(wintypes.ULONG))
+    ]
+
+class INPUT_UNION(ctypes.Union):
+    _fields_ = [("mi", MOUSEINPUT), ("ki", KEYBDINPUT)]
+
+class INPUT(ctypes.Structure):
+    _fields_ = [("type", wintypes.DWORD), ("union", INPUT_UNION)]
+
+def send_unicode_text(text):
+    """通过一次SendInput调用输入整段文本
+    
+    每个UTF-16代码单元生成一对按下/释放的KEYEVENTF_UNICODE事件，
+    无需VkKeyScan映射和Shift处理，也不需要逐字符sleep。
+    
+    Returns:
+        int: 成功注入的事件数
+    """
+    code_units = text.encode('utf-16-le')
+    count = len(code_units) // 2
+    inputs = (INPUT * (count * 2))()
+    for i in range(count):
+        unit = code_units[2 * i] | (code_units[2 * i + 1] << 8)
+        for j, flags in ((2 * i, KEYEVENTF_UNICODE), (2 * i + 1, KEYEVENTF_UNICODE | KEYEVENTF_KEYUP)):
+            inputs[j].type = INPUT_KEYBOARD
+            inputs[j].union.ki = KEYBDINPUT(0, unit, flags, 0, None)
+    return ctypes.windll.user32.SendInput(len(inputs), inputs, ctypes.sizeof(INPUT))
+
+def send_key_combo(*vk_codes):
+    """通过一次SendInput调用按下并释放组合键，例如send_key_combo(VK_CONTROL, ord('V'))
+    
+    Returns:
+        int: 成功注入的事件数
+    """
+    inputs = (INPUT * (len(vk_codes) * 2))()
+    events = [(vk, 0) for vk in vk_codes] + [(vk, KEYEVENTF_KEYUP) for vk in reversed(vk_codes)]
+    for i, (vk, flags) in enumerate(events):
+        inputs[i].type = INPUT_KEYBOARD
+        inputs[i].union.ki = KEYBDINPUT(vk, 0, flags, 0, None)
+    return ctypes.windll.user32.SendInput(len(inputs), inputs, ctypes.sizeof(INPUT))
+
+# 剪贴板相关的Win32 API，显式声明参数和返回类型以免64位句柄被截断
+CF_UNICODETEXT = 13
+GMEM_MOVEABLE = 0x0002
+
+_user32 = ctypes.WinDLL('user32', use_last_error=True)
+_kernel32 = ctypes.WinDLL('kernel32', use_last_error=True)
+_user32.OpenClipboard.argtypes = [wintypes.HWND]
+_user32.OpenClipboard.restype = wintypes.BOOL
+_user32.EmptyClipboard.restype = wintypes.BOOL
+_user32.SetClipboardData.argtypes = [wintypes.UINT, wintypes.HANDLE]
+_user32.SetClipboardData.restype = wintypes.HANDLE
+_user32.CloseClipboard.restype = wintypes.BOOL
+_kernel32.GlobalAlloc.argtypes = [wintypes.UINT, ctypes.c_size_t]
+_kernel32.GlobalAlloc.restype = wintypes.HGLOBAL
+_kernel32.GlobalLock.argtypes = [wintypes.HGLOBAL]
+_kernel32.GlobalLock.restype = wintypes.LPVOID
+_kernel32.GlobalUnlock.argtypes = [wintypes.HGLOBAL]
+_kernel32.GlobalFree.argtypes = [wintypes.HGLOBAL]
+
+def set_clipboard_text(text, hwnd=None):
+    """直接通过Win32 API把文本放入剪贴板，只做一次Open/Empty/Set/Close
+    
+    Raises:
+        OSError: 剪贴板被占用或内存分配失败
+    """
+    data = text.encode('utf-16-le') + b'\x00\x00'
+    handle = _kernel32.GlobalAlloc(GMEM_MOVEABLE, len(data))
+    if not handle:
+        raise ctypes.WinError(ctypes.get_last_error())
+    ptr = _kernel32.GlobalLock(handle)
+    if not ptr:
+        _kernel32.GlobalFree(handle)
+        raise ctypes.WinError(ctypes.get_last_error())
+    ctypes.memmove(ptr, data, len(data))
+    _kernel32.GlobalUnlock(handle)
+    
+    if not _user32.OpenClipboard(hwnd):
+        _kernel32.GlobalFree(handle)
+        raise ctypes.WinError(ctypes.get_last_error())
+    try:
+        _user32.EmptyClipboard()
+        if not _user32.SetClipboardData(CF_UNICODETEXT, handle):
+            _kernel32.GlobalFree(handle)
+            raise ctypes.WinError(ctypes.get_last_error())
+        # 设置成功后内存归系统所有，不能再释放
+    finally:
+        _user32.CloseClipboard()
+
 class AugmentInteractor:
     """与VSCode中的augment对话区域交互的类"""
     
+    # 窗口句柄缓存: 小写窗口标题 -> HWND，多次创建交互器时避免重复枚举所有窗口
+    _hwnd_cache = {}
+    
     def __init__(self, window_title="Visual Studio Code"):
         """初始化交互器
         
@@ -33,6 +153,7 @@ class AugmentInteractor:
             window_title: VSCode窗口标题
         """
         self.window_title = window_title
+        self._title_lower = window_title.lower()
         self.hwnd = None
         
         # 查找窗口
@@ -51,18 +172,43 @@ class AugmentInteractor:
     
     def find_window(self):
         """查找VSCode窗口"""
+        # 缓存的句柄仍然有效且标题匹配时直接使用
+        cached = self._hwnd_cache.get(self._title_lower)
+        if cached and win32gui.IsWindow(cached) and win32gui.IsWindowVisible(cached):
+            title = win32gui.GetWindowText(cached)
+            if self._title_lower in title.lower():
+                self.hwnd = cached
+                print(f"找到窗口: {title} (HWND: {self.hwnd})")
+                return True
+        
+        # 先只遍历VSCode窗口类的顶层窗口，找不到再枚举全部窗口
+        windows = []
+        try:
+            hwnd = win32gui.FindWindowEx(None, None, VSCODE_WINDOW_CLASS, None)
+            while hwnd:
+                if win32gui.IsWindowVisible(hwnd):
+                    title = win32gui.GetWindowText(hwnd)
+                    if self._title_lower in title.lower():
+                        windows.append((hwnd, title))
+                        break
+                hwnd = win32gui.FindWindowEx(None, hwnd, VSCODE_WINDOW_CLASS, None)
+        except win32gui.error:
+            # 部分pywin32版本在找不到窗口时抛出异常而不是返回0
+            pass
+        
         def callback(hwnd, windows):
             if win32gui.IsWindowVisible(hwnd):
                 title = win32gui.GetWindowText(hwnd)
-                if self.window_title.lower() in title.lower():
+                if self._title_lower in title.lower():
                     windows.append((hwnd, title))
             return True
         
-        windows = []
-        win32gui.EnumWindows(callback, windows)
+        if not windows:
+            win32gui.EnumWindows(callback, windows)
         
         if windows:
             self.hwnd = windows[0][0]
+            self._hwnd_cache[self._title_lower] = self.hwnd
             print(f"找到窗口: {windows[0][1]} (HWND: {self.hwnd})")
             return True
         else:
@@ -124,8 +270,11 @@ class AugmentInteractor:
         
         try:
             win32gui.SetForegroundWindow(self.hwnd)
-            time.sleep(0.5)  # 等待窗口激活
-            print("窗口已激活")
+            # 窗口真正成为前台窗口即可继续，不再固定等待0.5秒
+            if wait_until(lambda: win32gui.GetForegroundWindow() == self.hwnd, timeout=0.5):
+                print("窗口已激活")
+            else:
+                print("等待窗口激活超时")
             return True
         except Exception as e:
             print(f"激活窗口失败: {e}")
@@ -155,9 +304,9 @@ class AugmentInteractor:
                 
                 # 设置鼠标位置并点击
                 win32api.SetCursorPos((screen_x, screen_y))
-                time.sleep(0.1)
+                wait_until(lambda: win32api.GetCursorPos() == (screen_x, screen_y), timeout=0.1)
+                # 按下和释放进入同一输入队列，按顺序处理，无需中间等待
                 win32api.mouse_event(win32con.MOUSEEVENTF_LEFTDOWN, 0, 0, 0, 0)
-                time.sleep(0.1)
                 win32api.mouse_event(win32con.MOUSEEVENTF_LEFTUP, 0, 0, 0, 0)
                 
                 print(f"点击输入区域: 窗口坐标({x}, {y}), 屏幕坐标({screen_x}, {screen_y})")
@@ -166,7 +315,6 @@ class AugmentInteractor:
                 print(f"点击输入区域失败: {e}")
                 return False
         
-        time.sleep(0.2)
         return True
     
     def send_message(self, message):
@@ -193,47 +341,20 @@ class AugmentInteractor:
         else:
             # 使用替代方法 - 使用剪贴板
             try:
-                import pyperclip
-                pyperclip.copy(message)
+                set_clipboard_text(message, self.hwnd)
                 
-                # 按下Ctrl+V
-                win32api.keybd_event(win32con.VK_CONTROL, 0, 0, 0)
-                time.sleep(0.1)
-                win32api.keybd_event(ord('V'), 0, 0, 0)
-                time.sleep(0.1)
-                win32api.keybd_event(ord('V'), 0, win32con.KEYEVENTF_KEYUP, 0)
-                time.sleep(0.1)
-                win32api.keybd_event(win32con.VK_CONTROL, 0, win32con.KEYEVENTF_KEYUP, 0)
+                # 一次SendInput调用完成Ctrl+V
+                send_key_combo(win32con.VK_CONTROL, ord('V'))
                 
                 print(f"粘贴消息: {message}")
-            except ImportError:
-                print("pyperclip模块不可用，使用逐字符输入")
-                # 逐字符输入
-                for c in message:
-                    try:
-                        # 使用VkKeyScan获取虚拟键码
-                        vk = win32api.VkKeyScan(c)
-                        if vk == -1:
-                            continue  # 跳过无法映射的字符
-                        
-                        # 提取虚拟键码和修饰键信息
-                        vk_code = vk & 0xFF
-                        shift_state = (vk >> 8) & 0xFF
-                        
-                        # 如果需要按下Shift键
-                        if shift_state & 1:
-                            win32api.keybd_event(win32con.VK_SHIFT, 0, 0, 0)
-                        
-                        # 按下并释放字符键
-                        win32api.keybd_event(vk_code, 0, 0, 0)
-                        time.sleep(0.01)
-                        win32api.keybd_event(vk_code, 0, win32con.KEYEVENTF_KEYUP, 0)
-                        
-                        # 如果按下了Shift键，释放它
-                        if shift_state & 1:
-                            win32api.keybd_event(win32con.VK_SHIFT, 0, win32con.KEYEVENTF_KEYUP, 0)
-                    except Exception as e:
-                        print(f"输入字符 '{c}' 失败: {e}")
+            except OSError as e:
+                print(f"剪贴板不可用({e})，批量注入Unicode键盘事件")
+                try:
+                    sent = send_unicode_text(message)
+                    if sent != len(message.encode('utf-16-le')):
+                        print(f"键盘事件未全部注入: {sent}")
+                except Exception as e:
+                    print(f"输入消息失败: {e}")
         
         time.sleep(0.2)
         print(f"输入消息: {message}")
@@ -242,10 +363,8 @@ class AugmentInteractor:
         if UI_CTRL_V2_AVAILABLE:
             self.input_controller.key_press('enter')
         else:
-            # 使用替代方法
-            win32api.keybd_event(win32con.VK_RETURN, 0, 0, 0)
-            time.sleep(0.1)
-            win32api.keybd_event(win32con.VK_RETURN, 0, win32con.KEYEVENTF_KEYUP, 0)
+            # 使用替代方法，与粘贴事件同在一个输入队列中按顺序处理
+            send_key_combo(win32con.VK_RETURN)
         
         print("消息已发送")
         return True
@@ -10,6 +10,7 @@ import os
 import sys
 import time
 import argparse
+import functools
 from pathlib import Path
 
 # 添加当前目录到路径
@@ -115,30 +116,36 @@ def cmd_batch(args):
         return
     
     try:
-        with open(args.file, "r", encoding="utf-8") as f:
-            lines = f.readlines()
-        
-        for i, line in enumerate(lines):
-            line = line.strip()
-            if not line or line.startswith("#"):
-                continue
-            
-            print(f"执行第 {i+1} 行: {line[:50]}...")
-            maestro.send_message(line)
-            
-            if args.wait:
-                print("等待响应...")
-                maestro.wait_for_response(timeout=args.timeout)
-            
-            if i < len(lines) - 1:
-                time.sleep(args.interval)
+        # 逐行流式读取，不把整个文件读入内存
+        with open(args.file, "r", encoding="utf-8", buffering=1 << 17) as f:
+            next_send = None
+            for i, line in enumerate(f):
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                
+                # 间隔从上一条消息发出时开始计算，与等待响应的时间重叠，
+                # 只补足剩余部分；无需预先知道总行数
+                if next_send is not None:
+                    remaining = next_send - time.monotonic()
+                    if remaining > 0:
+                        time.sleep(remaining)
+                
+                print(f"执行第 {i+1} 行: {line[:50]}...")
+                maestro.send_message(line)
+                next_send = time.monotonic() + args.interval
+                
+                if args.wait:
+                    print("等待响应...")
+                    maestro.wait_for_response(timeout=args.timeout)
         
         print("批处理完成")
     except Exception as e:
         print(f"批处理错误: {e}")
 
-def main():
-    """主函数"""
+@functools.lru_cache(maxsize=1)
+def _build_parser():
+    """构建命令行解析器，只构建一次"""
     parser = argparse.ArgumentParser(description="Maestro - 智能助理窗口管理工具")
     parser.add_argument("--window", "-w", default="Visual Studio Code", help="窗口标题")
     parser.add_argument("--debug", "-d", action="store_true", help="启用调试模式")
@@ -185,6 +192,11 @@ def main():
     batch_parser.add_argument("--interval", "-i", type=float, default=1.0, help="消息间隔时间（秒）")
     batch_parser.set_defaults(func=cmd_batch)
     
+    return parser
+
+def main():
+    """主函数"""
+    parser = _build_parser()
     args = parser.parse_args()
     
     if args.command is None:
@@ -4,12 +4,28 @@ Maestro - UI自动化工具
 
 __version__ = "0.1.0"
 
-from .core.window_capture import WindowCapture
-from .core.ui_detector import UIDetector
-from .core.window_monitor import WindowMonitor
-from .core.ui_types import UIElement, ElementType
-from .core.process_manager import ProcessManager
-from .core.input_controller import InputController
+import importlib
+
+# 按需导入子模块（PEP 562），避免只用到平台层或CLI部分功能时也加载检测模型等重型依赖
+_LAZY = {
+    'WindowCapture': '.core.window_capture',
+    'UIDetector': '.core.ui_detector',
+    'WindowMonitor': '.core.window_monitor',
+    'UIElement': '.core.ui_types',
+    'ElementType': '.core.ui_types',
+    'ProcessManager': '.core.process_manager',
+    'InputController': '.core.input_controller',
+}
+
+def __getattr__(name):
+    if name not in _LAZY:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_LAZY[name], __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(list(globals()) + list(_LAZY))
 
 __all__ = [
     'WindowCapture', 
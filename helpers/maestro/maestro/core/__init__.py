@@ -2,12 +2,28 @@
 Maestro Core - UI detection and control components
 """
 
-from .window_capture import WindowCapture
-from .ui_detector import UIDetector
-from .window_monitor import WindowMonitor
-from .ui_types import UIElement, ElementType
-from .process_manager import ProcessManager
-from .input_controller import InputController
+import importlib
+
+# 按需导入子模块（PEP 562），只在首次访问时加载对应依赖
+_LAZY = {
+    'WindowCapture': '.window_capture',
+    'UIDetector': '.ui_detector',
+    'WindowMonitor': '.window_monitor',
+    'UIElement': '.ui_types',
+    'ElementType': '.ui_types',
+    'ProcessManager': '.process_manager',
+    'InputController': '.input_controller',
+}
+
+def __getattr__(name):
+    if name not in _LAZY:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_LAZY[name], __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(list(globals()) + list(_LAZY))
 
 __all__ = [
     'WindowCapture', 
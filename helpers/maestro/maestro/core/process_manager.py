@@ -1,8 +1,16 @@
 import os
+import locale
 import subprocess
+import tempfile
 import time
 import logging
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
 
 logger = logging.getLogger("maestro.process")
 
@@ -32,52 +40,148 @@ class ProcessManager:
     def __init__(self):
         """Initialize process manager"""
         self._managed_processes: Dict[int, subprocess.Popen] = {}
+        # File-backed stdout/stderr per managed process, read back in bulk on demand
+        self._process_output: Dict[int, Tuple] = {}
+        # Decoded (stdout, stderr) of managed processes that have exited
+        self._finished_output: Dict[int, Tuple[str, str]] = {}
+        
+    def _close_output(self, pid: int):
+        """Close and drop the output files of a managed process"""
+        for f in self._process_output.pop(pid, ()):
+            f.close()
         
     def start_process(self, cmd, shell: bool = False, cwd: str = None) -> Optional[int]:
         """Start a new process"""
+        # Temp files instead of pipes: the child never blocks on a full pipe and
+        # nothing has to drain it while the process runs
+        out = tempfile.TemporaryFile(buffering=1 << 20)
+        err = tempfile.TemporaryFile(buffering=1 << 20)
         try:
             process = subprocess.Popen(
                 cmd,
                 shell=shell,
                 cwd=cwd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True
+                stdout=out,
+                stderr=err
             )
             
             pid = process.pid
             self._managed_processes[pid] = process
+            self._process_output[pid] = (out, err)
+            # A reused PID must not return the output of the earlier process
+            self._finished_output.pop(pid, None)
             logger.info(f"Started process {pid}: {cmd}")
             return pid
             
         except Exception as e:
+            out.close()
+            err.close()
             logger.error(f"Failed to start process: {e}")
             return None
             
     def kill_process(self, pid: int) -> bool:
         """Kill a process by PID"""
+        return self.kill_processes([pid]).get(pid, False)
+        
+    def kill_processes(self, pids: Iterable[int], timeout: float = 2.0) -> Dict[int, bool]:
+        """Terminate processes in parallel, killing any still alive after timeout
+        
+        All processes get SIGTERM first and are waited on together, so the
+        total wait is bounded by timeout plus one second for the SIGKILL
+        round regardless of how many processes are stopped.
+        
+        Returns:
+            Mapping of PID to whether the process is gone
+        """
+        pids = list(pids)
+        results = {pid: False for pid in pids}
         try:
-            if pid in self._managed_processes:
-                process = self._managed_processes[pid]
-                process.kill()
-                process.wait(timeout=5)
-                del self._managed_processes[pid]
-                logger.info(f"Killed managed process {pid}")
-                return True
+            if not PSUTIL_AVAILABLE:
+                self._kill_managed_without_psutil(pids, timeout, results)
+                return results
                 
-            # Try to kill external process
-            import psutil
-            process = psutil.Process(pid)
-            process.kill()
-            logger.info(f"Killed external process {pid}")
-            return True
+            procs = []
+            for pid in pids:
+                try:
+                    procs.append(psutil.Process(pid))
+                except psutil.NoSuchProcess:
+                    # Already exited (and reaped); a managed process counts as stopped
+                    results[pid] = pid in self._managed_processes
+                    if not results[pid]:
+                        logger.error(f"Failed to kill process {pid}: no such process")
+                except psutil.Error as e:
+                    logger.error(f"Failed to kill process {pid}: {e}")
+                    
+            for proc in procs:
+                try:
+                    proc.terminate()
+                except psutil.NoSuchProcess:
+                    pass
+                except psutil.Error as e:
+                    logger.error(f"Failed to terminate process {proc.pid}: {e}")
+            gone, alive = psutil.wait_procs(procs, timeout=timeout)
+            
+            for proc in alive:
+                try:
+                    proc.kill()
+                except psutil.NoSuchProcess:
+                    pass
+                except psutil.Error as e:
+                    logger.error(f"Failed to kill process {proc.pid}: {e}")
+            killed, alive = psutil.wait_procs(alive, timeout=1)
+            
+            for proc in gone + killed:
+                results[proc.pid] = True
+                kind = "managed" if proc.pid in self._managed_processes else "external"
+                logger.info(f"Killed {kind} process {proc.pid}")
+            for proc in alive:
+                logger.error(f"Failed to kill process {proc.pid}: still running")
+            return results
             
         except Exception as e:
-            logger.error(f"Failed to kill process {pid}: {e}")
-            return False
+            logger.error(f"Failed to kill processes {pids}: {e}")
+            return results
+            
+        finally:
+            # Stop tracking only processes that are gone; a survivor stays managed
+            for pid in pids:
+                if not results[pid]:
+                    continue
+                process = self._managed_processes.pop(pid, None)
+                if process is not None:
+                    # Let Popen record the exit status of a child reaped by psutil
+                    process.poll()
+                self._close_output(pid)
+                
+    def _kill_managed_without_psutil(self, pids: List[int], timeout: float, results: Dict[int, bool]):
+        """Two-phase stop for managed processes when psutil is not installed"""
+        managed = [(pid, self._managed_processes[pid]) for pid in pids if pid in self._managed_processes]
+        for pid in pids:
+            if pid not in self._managed_processes:
+                logger.error(f"Failed to kill process {pid}: psutil is required for external processes")
+                
+        for _, process in managed:
+            process.terminate()
+        deadline = time.monotonic() + timeout
+        for pid, process in managed:
+            try:
+                process.wait(timeout=max(deadline - time.monotonic(), 0))
+            except subprocess.TimeoutExpired:
+                process.kill()
+                
+        for pid, process in managed:
+            try:
+                process.wait(timeout=1)
+                results[pid] = True
+                logger.info(f"Killed managed process {pid}")
+            except subprocess.TimeoutExpired:
+                logger.error(f"Failed to kill process {pid}: still running")
             
     def get_process_output(self, pid: int) -> Tuple[Optional[str], Optional[str]]:
         """Get stdout and stderr from a managed process"""
+        if pid in self._finished_output:
+            return self._finished_output[pid]
+            
         if pid not in self._managed_processes:
             return None, None
             
@@ -85,8 +189,19 @@ class ProcessManager:
         
         # Check if process has terminated
         if process.poll() is not None:
-            stdout, stderr = process.communicate()
-            return stdout, stderr
+            encoding = locale.getpreferredencoding(False)
+            results = []
+            for f in self._process_output[pid]:
+                f.seek(0)
+                # Same decoding and newline translation as text=True pipes
+                text = f.read().decode(encoding, errors="replace")
+                results.append(text.replace("\r\n", "\n").replace("\r", "\n"))
+                
+            # Read once: keep the decoded text, release the files and stop tracking the process
+            self._finished_output[pid] = (results[0], results[1])
+            self._close_output(pid)
+            del self._managed_processes[pid]
+            return results[0], results[1]
             
         # Process still running, return None
         return None, None 
\ No newline at end of file
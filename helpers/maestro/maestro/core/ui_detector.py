@@ -3,18 +3,109 @@ from pathlib import Path
 from typing import List, Optional, Dict, Any, Tuple
 import logging
 import importlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+
+import numpy as np
+from PIL import Image as PILImage
+
+try:
+    import cv2
+    CV2_AVAILABLE = True
+except ImportError:
+    CV2_AVAILABLE = False
 
 from .ui_types import UIElement, ElementType
 from .window_capture import WindowCapture, WindowInfo
 
 logger = logging.getLogger("maestro.detector")
 
+# YOLO推理的输入尺寸
+MODEL_IMGSZ = 640
+
+# 高度不超过此值的元素图像按单行文本直接批量识别，更高的元素先做文本检测再逐行识别
+OCR_SINGLE_LINE_MAX_HEIGHT = 48
+
+# analyze_all_windows中每攒够这么多张截图就推理一次，与剩余窗口的捕获重叠
+CAPTURE_BATCH_SIZE = 4
+
+# 元素数量少于此值时直接线性查找，建索引反而更慢
+SPATIAL_INDEX_MIN_ELEMENTS = 32
+
+# 空间索引的网格边长（像素）
+SPATIAL_INDEX_CELL = 64
+
+# YOLO类别索引到ElementType的映射表，可以根据模型输出类别进行扩展
+_CLASS_TO_TYPE = (
+    ElementType.BUTTON,
+    ElementType.LINK,
+    ElementType.MENU,
+    ElementType.CHECKBOX,
+    ElementType.RADIO,
+    ElementType.DROPDOWN,
+    ElementType.INPUT,
+    ElementType.TAB,
+    ElementType.ICON,
+    ElementType.TEXT,
+)
+
+# ElementType到int8编码，用于向量化的类型筛选
+_TYPE_CODES = {t: i for i, t in enumerate(ElementType)}
+
+def build_spatial_index(bboxes: List[Tuple[int, int, int, int]], cell: int = 64) -> Dict[Tuple[int, int], List[int]]:
+    """构建均匀网格空间索引
+    
+    返回{(cx, cy): [与该网格相交的边界框下标]}，每个网格内下标按升序排列。
+    """
+    index = {}
+    for i, (x1, y1, x2, y2) in enumerate(bboxes):
+        for cx in range(x1 // cell, x2 // cell + 1):
+            for cy in range(y1 // cell, y2 // cell + 1):
+                index.setdefault((cx, cy), []).append(i)
+    return index
+
+class DetectionResult(list):
+    """analyze_*返回的UI元素列表，附带分析结束时一次性构建的查找数组
+    
+    bboxes是(N,4)边界框数组，type_codes是int8类型编码数组，查找时直接使用，
+    不必每次从元素重新构建；grid是位置查找用的空间索引，第一次按位置查找时构建。
+    列表被修改后这些数组和索引随即作废，查找退回到临时构建或线性查找；
+    元素的几何信息在分析结束后视为只读。
+    """
+    
+    def __init__(self, elements=(), bboxes: Optional[np.ndarray] = None, type_codes: Optional[np.ndarray] = None):
+        super().__init__(elements)
+        self.bboxes = bboxes
+        self.type_codes = type_codes
+        self.grid = None
+    
+    def _invalidate(self):
+        """列表内容变化，丢弃附带的查找数组和空间索引"""
+        self.bboxes = None
+        self.type_codes = None
+        self.grid = None
+
+def _invalidating(name):
+    method = getattr(list, name)
+    def wrapper(self, *args, **kwargs):
+        self._invalidate()
+        return method(self, *args, **kwargs)
+    wrapper.__name__ = name
+    return wrapper
+
+for _name in ("__setitem__", "__delitem__", "__iadd__", "__imul__", "append", "extend",
+              "insert", "pop", "remove", "clear", "sort", "reverse"):
+    setattr(DetectionResult, _name, _invalidating(_name))
+
 class UIDetector:
-    def __init__(self, weights_dir: str = "weights", conf_threshold: float = 0.25, enable_ocr: bool = True, enable_caption: bool = True):
+    def __init__(self, weights_dir: str = "weights", conf_threshold: float = 0.25, enable_ocr: bool = True, enable_caption: bool = True, fp16: bool = True):
         self.weights_dir = Path(weights_dir)
         self.conf_threshold = conf_threshold
         self.enable_ocr = enable_ocr
         self.enable_caption = enable_caption
+        # 在CUDA上用FP16推理YOLO；只有CPU时不起作用
+        self.fp16 = fp16
         
         # 检查依赖是否安装
         self.has_yolo = self._check_module("ultralytics")
@@ -23,6 +114,8 @@ class UIDetector:
         
         # 加载YOLO模型
         self.model = None
+        self.device = "cpu"
+        self.half = False
         if self.has_yolo:
             try:
                 self.model = self._load_model()
@@ -32,16 +125,17 @@ class UIDetector:
         
         self.window_capture = WindowCapture()
         
-        # 加载OCR模型
-        self.ocr = None
-        if self.enable_ocr:
-            self._load_ocr()
+        # 按窗口句柄复用的捕获会话，句柄只在创建时设置一次
+        self._capture_pool: Dict[Any, WindowCapture] = {}
+
         
-        # 加载caption模型
+        # OCR和caption模型在第一次分析时才加载，只做YOLO检测时不占用启动时间和内存
+        self.ocr = None
         self.caption_model = None
         self.caption_processor = None
-        if self.enable_caption and self.has_torch and self.has_transformers:
-            self._load_caption_model()
+        self._ocr_loaded = False
+        self._caption_loaded = False
+        self._load_lock = threading.Lock()
     
     def _check_module(self, module_name: str) -> bool:
         """检查模块是否已安装"""
@@ -61,7 +155,7 @@ class UIDetector:
             try:
                 from ultralytics import YOLO
                 logger.info("使用默认的YOLOv8n模型")
-                return YOLO("yolov8n.pt")
+                return self._setup_device(YOLO("yolov8n.pt"))
             except Exception as e:
                 logger.error(f"无法加载默认模型: {e}")
                 return None
@@ -69,11 +163,31 @@ class UIDetector:
         try:
             from ultralytics import YOLO
             logger.info(f"从 {model_path} 加载模型")
-            return YOLO(str(model_path))
+            return self._setup_device(YOLO(str(model_path)))
         except Exception as e:
             logger.error(f"加载模型失败: {e}")
             return None
     
+    def _setup_device(self, model):
+        """融合Conv+BN并把YOLO模型固定到推理设备上，CUDA可用且开启fp16时启用半精度推理"""
+        try:
+            model.fuse()
+        except Exception as e:
+            logger.debug(f"模型层融合失败: {e}")
+        
+        # 只做推理，切换到eval模式
+        if hasattr(model, "model") and hasattr(model.model, "eval"):
+            model.model.eval()
+        
+        if self.has_torch:
+            import torch
+            if torch.cuda.is_available():
+                self.device = "cuda"
+                self.half = self.fp16
+        model.to(self.device)
+        logger.info(f"YOLO推理设备: {self.device}{' (FP16)' if self.half else ''}")
+        return model
+    
     def _load_ocr(self):
         """加载PaddleOCR模型"""
         try:
@@ -88,6 +202,31 @@ class UIDetector:
             logger.warning(f"加载PaddleOCR失败: {e}")
             self.enable_ocr = False
     
+    def _ensure_ocr(self):
+        """第一次使用时加载OCR模型，只加载一次"""
+        if self._ocr_loaded:
+            return
+        with self._load_lock:
+            if not self._ocr_loaded:
+                if self.enable_ocr:
+                    self._load_ocr()
+                self._ocr_loaded = True
+    
+    def get_ocr(self):
+        """返回OCR模型，第一次调用时加载；OCR被禁用或加载失败时返回None"""
+        self._ensure_ocr()
+        return self.ocr if self.enable_ocr else None
+    
+    def _ensure_caption(self):
+        """第一次使用时加载caption模型，只加载一次"""
+        if self._caption_loaded:
+            return
+        with self._load_lock:
+            if not self._caption_loaded:
+                if self.enable_caption and self.has_torch and self.has_transformers:
+                    self._load_caption_model()
+                self._caption_loaded = True
+    
     def _load_caption_model(self):
         """加载icon_caption模型"""
         try:
@@ -106,127 +245,235 @@ class UIDetector:
             self.caption_processor = AutoProcessor.from_pretrained(str(caption_path))
             self.caption_model = AutoModelForCausalLM.from_pretrained(str(caption_path))
             
-            # 如果有GPU，将模型移到GPU上
+            # 如果有GPU，将模型以半精度移到GPU上，显存带宽和计算量减半
             if torch.cuda.is_available():
-                self.caption_model = self.caption_model.to("cuda")
+                self.caption_model = self.caption_model.to("cuda", dtype=torch.float16)
+            self.caption_model.eval()
+            self.caption_model.config.use_cache = True
             
             logger.info("Caption模型加载成功")
         except Exception as e:
             logger.warning(f"加载caption模型失败: {e}")
             self.enable_caption = False
     
-    def analyze_image(self, image, conf: float = None) -> List[UIElement]:
-        """分析图像并返回检测到的UI元素"""
+    def _inference_mode(self):
+        """返回torch.inference_mode上下文，没有torch时返回空上下文"""
+        if self.has_torch:
+            import torch
+            return torch.inference_mode()
+        return nullcontext()
+    
+    def _to_numpy(self, image) -> np.ndarray:
+        """把PIL图像或numpy数组统一为numpy数组"""
+        if isinstance(image, PILImage.Image):
+            return np.array(image)
+        return image
+    
+    def _resize_for_model(self, np_image: np.ndarray) -> Tuple[np.ndarray, float]:
+        """把截图缩小到长边为MODEL_IMGSZ，返回(缩小后的图像, 缩放比例)
+        
+        用OpenCV的INTER_AREA一次缩放，代替ultralytics在predict内部的缩放；
+        没有OpenCV或图像本来就不大时原样返回，比例为1.0。
+        """
+        h, w = np_image.shape[:2]
+        if not CV2_AVAILABLE or max(h, w) <= MODEL_IMGSZ:
+            return np_image, 1.0
+        
+        s = MODEL_IMGSZ / max(h, w)
+        rw, rh = max(1, round(w * s)), max(1, round(h * s))
+        small = cv2.resize(np_image, (rw, rh), interpolation=cv2.INTER_AREA)
+        return small, s
+    
+    def _build_elements(self, result, np_image: np.ndarray, scale: float = 1.0) -> DetectionResult:
+        """把一张图像的YOLO检测结果转换为UIElement列表，并按需识别文本和生成描述
+        
+        scale是推理图像相对np_image的缩放比例，检测框会换算回原图坐标，
+        OCR和caption使用原图分辨率的元素图像。
+        """
+        elements = []
+        
+        ocr_enabled = self.enable_ocr and self.ocr is not None
+        ocr_elements = []
+        ocr_crops = []
+        caption_enabled = self.enable_caption and self.caption_model is not None
+        caption_elements = []
+        caption_crops = []
+        
+        # 每个结果只做一次设备到主机的拷贝，而不是每个框逐个同步
+        boxes = result.boxes
+        xyxy = boxes.xyxy.detach().cpu().numpy()
+        if scale != 1.0:
+            xyxy = xyxy / scale
+        xyxy = xyxy.astype(np.int32)
+        classes = boxes.cls.detach().cpu().numpy().astype(np.int32)
+        confs = boxes.conf.detach().cpu().numpy()
+        
+        # 确保坐标在图像范围内
+        np.maximum(xyxy[:, :2], 0, out=xyxy[:, :2])
+        np.minimum(xyxy[:, 2], np_image.shape[1], out=xyxy[:, 2])
+        np.minimum(xyxy[:, 3], np_image.shape[0], out=xyxy[:, 3])
+        
+        for (x1, y1, x2, y2), cls, conf in zip(xyxy.tolist(), classes.tolist(), confs.tolist()):
+            # 映射类别索引到ElementType
+            element_type = self._map_class_to_type(cls)
+            
+            # 创建UIElement
+            element = UIElement(
+                type=element_type,
+                bbox=(x1, y1, x2, y2),
+                confidence=conf
+            )
+            
+            # 如果坐标有效，提取元素区域图像
+            if x1 < x2 and y1 < y2:
+                element_image = np_image[y1:y2, x1:x2]
+                
+                # 如果启用了OCR，先收集元素图像，循环结束后批量识别文本
+                if ocr_enabled:
+                    ocr_elements.append(element)
+                    ocr_crops.append(element_image)
+                
+                # 如果启用了caption模型，先收集元素图像，循环结束后批量生成描述
+                # 处理器直接接受numpy数组，不再逐个转换为PIL图像；
+                # RGBA截图只取RGB三个通道的视图，不做拷贝
+                if caption_enabled and element_image.size > 0:
+                    caption_elements.append(element)
+                    caption_crops.append(element_image[..., :3] if element_image.ndim == 3 else element_image)
+            
+            elements.append(element)
+        
+        if ocr_crops:
+            self._ocr_elements(ocr_elements, ocr_crops)
+        if caption_crops:
+            self._caption_elements(caption_elements, caption_crops)
+        
+        logger.debug(f"检测到 {len(elements)} 个UI元素")
+        
+        # 查找用的数组在这里构建一次，边界框直接复用已换算好的检测框
+        type_codes = np.fromiter((_TYPE_CODES[e.type] for e in elements), dtype=np.int8, count=len(elements))
+        return DetectionResult(elements, bboxes=xyxy, type_codes=type_codes)
+    
+    @staticmethod
+    def _to_bgr(crop: np.ndarray) -> np.ndarray:
+        """把元素图像转换为识别器要求的3通道图像
+        
+        截图是4通道的BGRA（Windows的GetBitmapBits）或RGBA，直接去掉alpha通道；
+        PaddleOCR.ocr()会自己处理alpha，单独调用识别器时必须先转换。
+        """
+        if crop.ndim == 2:
+            return np.repeat(crop[:, :, None], 3, axis=2)
+        if crop.shape[2] == 4:
+            return crop[:, :, :3]
+        return crop
+    
+    def _ocr_elements(self, elements: List[UIElement], crops: List[np.ndarray]):
+        """识别所有元素图像中的文本，把文本按顺序写回元素
+        
+        单行高度的元素已经由YOLO定位，跳过PaddleOCR的文本检测，
+        一起交给识别器按rec_batch_num分批识别；更高的元素可能包含多行文本，
+        仍然先检测文本行，再用空格拼接各行。
+        """
+        crops = [self._to_bgr(crop) for crop in crops]
+        single = [i for i, crop in enumerate(crops) if crop.shape[0] <= OCR_SINGLE_LINE_MAX_HEIGHT]
+        multi = [i for i, crop in enumerate(crops) if crop.shape[0] > OCR_SINGLE_LINE_MAX_HEIGHT]
+        
+        if single:
+            try:
+                single_crops = [crops[i] for i in single]
+                recognizer = getattr(self.ocr, "text_recognizer", None)
+                if recognizer is not None:
+                    classifier = getattr(self.ocr, "text_classifier", None)
+                    if classifier is not None:
+                        single_crops, _, _ = classifier(single_crops)
+                    rec_results, _ = recognizer(single_crops)
+                else:
+                    # 没有识别器属性的版本，退回逐个识别，但同样跳过检测
+                    rec_results = [self.ocr.ocr(crop, det=False, cls=True)[0][0] for crop in single_crops]
+                
+                for i, (text, score) in zip(single, rec_results):
+                    if text:
+                        elements[i].text = text
+                        logger.debug(f"OCR文本: {text}")
+            except Exception as e:
+                logger.warning(f"OCR错误: {e}")
+        
+        for i in multi:
+            try:
+                ocr_result = self.ocr.ocr(crops[i], cls=True)
+                if ocr_result and ocr_result[0]:
+                    texts = [line[1][0] for line in ocr_result[0] if line[1][0]]
+                    if texts:
+                        elements[i].text = " ".join(texts)
+                        logger.debug(f"OCR文本: {elements[i].text}")
+            except Exception as e:
+                logger.warning(f"OCR错误: {e}")
+    
+    def _caption_elements(self, elements: List[UIElement], crops: List[np.ndarray]):
+        """对所有元素图像做一次批量caption推理，把描述按顺序写回元素"""
+        try:
+            import torch
+            
+            use_cuda = torch.cuda.is_available()
+            
+            # 准备输入
+            inputs = self.caption_processor(images=crops, return_tensors="pt")
+            pixel_values = inputs["pixel_values"]
+            
+            # 如果有GPU，只把生成用到的图像张量一次性异步拷到GPU，并直接转换为半精度
+            if use_cuda:
+                pixel_values = pixel_values.to("cuda", dtype=torch.float16, non_blocking=True)
+            
+            # 一次生成所有描述
+            autocast = torch.autocast("cuda", dtype=torch.float16) if use_cuda else nullcontext()
+            with torch.inference_mode(), autocast:
+                generated_ids = self.caption_model.generate(
+                    pixel_values=pixel_values,
+                    max_new_tokens=50,
+                    do_sample=False,
+                    num_beams=1,
+                    use_cache=True
+                )
+            
+            # 解码生成的描述
+            generated_texts = self.caption_processor.batch_decode(generated_ids, skip_special_tokens=True)
+            for element, generated_text in zip(elements, generated_texts):
+                element.description = generated_text.strip()
+                logger.debug(f"描述: {element.description}")
+        except Exception as e:
+            logger.warning(f"Caption错误: {e}")
+    
+    def analyze_images(self, images: List[Any], conf: float = None) -> List[List[UIElement]]:
+        """批量分析多张图像，只调用一次YOLO推理，按输入顺序返回各自的UI元素"""
         if conf is None:
             conf = self.conf_threshold
         
         # 检查YOLO模型是否可用
         if not self.has_yolo or self.model is None:
             logger.warning("YOLO模型不可用，无法分析图像")
-            return []
+            return [[] for _ in images]
             
         try:
-            import numpy as np
-            from PIL import Image as PILImage
+            self._ensure_ocr()
+            self._ensure_caption()
             
-            # 转换为numpy数组
-            if isinstance(image, PILImage.Image):
-                np_image = np.array(image)
-                pil_image = image
-            else:
-                np_image = image
-                pil_image = PILImage.fromarray(np_image)
-                
-            # 运行YOLO预测
-            results = self.model.predict(np_image, imgsz=640, conf=conf)
+            np_images = [self._to_numpy(image) for image in images]
+            resized = [self._resize_for_model(np_image) for np_image in np_images]
             
-            # 转换结果为UIElements
-            elements = []
-            for r in results:
-                boxes = r.boxes
-                for box in boxes:
-                    # 获取坐标
-                    x1, y1, x2, y2 = box.xyxy[0].cpu().numpy().astype(int)
-                    
-                    # 确保坐标在图像范围内
-                    x1 = max(0, x1)
-                    y1 = max(0, y1)
-                    x2 = min(np_image.shape[1], x2)
-                    y2 = min(np_image.shape[0], y2)
-                    
-                    # 获取类别和置信度
-                    cls = box.cls[0].cpu().numpy().item()
-                    conf = box.conf[0].cpu().numpy().item()
-                    
-                    # 映射类别索引到ElementType
-                    element_type = self._map_class_to_type(int(cls))
-                    
-                    # 创建UIElement
-                    element = UIElement(
-                        type=element_type,
-                        bbox=(x1, y1, x2, y2),
-                        confidence=conf
-                    )
-                    
-                    # 如果坐标有效，提取元素区域图像
-                    if x1 < x2 and y1 < y2:
-                        element_image = np_image[y1:y2, x1:x2]
-                        
-                        # 如果启用了OCR，尝试识别文本
-                        if self.enable_ocr and self.ocr is not None:
-                            try:
-                                # 转换为PIL图像
-                                element_pil = PILImage.fromarray(element_image)
-                                ocr_result = self.ocr.ocr(np.array(element_pil), cls=True)
-                                
-                                # 提取文本
-                                if ocr_result and ocr_result[0]:
-                                    texts = []
-                                    for line in ocr_result[0]:
-                                        if line[1][0]:  # 文本内容
-                                            texts.append(line[1][0])
-                                    
-                                    if texts:
-                                        element.text = " ".join(texts)
-                                        logger.debug(f"OCR文本: {element.text}")
-                            except Exception as e:
-                                logger.warning(f"OCR错误: {e}")
-                        
-                        # 如果启用了caption模型，生成元素描述
-                        if self.enable_caption and self.caption_model is not None and element_image.size > 0:
-                            try:
-                                # 转换为PIL图像
-                                element_pil = PILImage.fromarray(element_image)
-                                
-                                # 准备输入
-                                inputs = self.caption_processor(images=element_pil, return_tensors="pt")
-                                
-                                # 如果有GPU，将输入移到GPU上
-                                if torch.cuda.is_available():
-                                    inputs = {k: v.to("cuda") for k, v in inputs.items()}
-                                
-                                # 生成描述
-                                with torch.no_grad():
-                                    generated_ids = self.caption_model.generate(
-                                        pixel_values=inputs["pixel_values"],
-                                        max_new_tokens=50,
-                                        do_sample=False
-                                    )
-                                
-                                # 解码生成的描述
-                                generated_text = self.caption_processor.batch_decode(generated_ids, skip_special_tokens=True)[0]
-                                element.description = generated_text.strip()
-                                logger.debug(f"描述: {element.description}")
-                            except Exception as e:
-                                logger.warning(f"Caption错误: {e}")
-                    
-                    elements.append(element)
-                    
-            logger.debug(f"检测到 {len(elements)} 个UI元素")
-            return elements
+            # 推理和后续的OCR/caption都不需要autograd，整个过程在inference_mode中进行
+            with self._inference_mode():
+                # 一次批量推理，ultralytics只需对已缩小的图像做letterbox填充
+                results = self.model.predict([small for small, _ in resized], imgsz=MODEL_IMGSZ, conf=conf,
+                                             half=self.half, device=self.device, verbose=False)
+                
+                return [self._build_elements(r, np_image, scale)
+                        for r, np_image, (_, scale) in zip(results, np_images, resized)]
         except Exception as e:
             logger.error(f"分析图像时出错: {e}")
-            return []
+            return [[] for _ in images]
+    
+    def analyze_image(self, image, conf: float = None) -> List[UIElement]:
+        """分析图像并返回检测到的UI元素"""
+        return self.analyze_images([image], conf)[0]
     
     def analyze_window(self, window_title: str) -> Optional[List[UIElement]]:
         """捕获并分析特定窗口"""
@@ -243,8 +490,7 @@ class UIDetector:
         
     def analyze_window_by_handle(self, hwnd: int) -> Optional[List[UIElement]]:
         """使用窗口句柄分析窗口"""
-        self.window_capture.set_window_handle(hwnd)
-        image = self.window_capture.capture()
+        image = self._capture_window(hwnd)
         if image is None:
             logger.warning(f"无法捕获句柄为 {hwnd} 的窗口")
             return None
@@ -253,43 +499,121 @@ class UIDetector:
         
     def analyze_all_windows(self) -> Dict[str, List[UIElement]]:
         """分析所有可见窗口"""
-        windows = self.window_capture.find_all_windows()
+        # 提交捕获前先忽略太小的窗口
+        windows = [w for w in self.window_capture.find_all_windows() if w.width > 50 and w.height > 50]
+        
+        # 已经不存在的窗口不再保留捕获会话
+        alive = {w.id for w in windows}
+        for handle in [h for h in self._capture_pool if h not in alive]:
+            del self._capture_pool[handle]
+        
+        # 捕获前需要激活窗口，前台窗口是全局状态，所以捕获在一个后台线程中按顺序进行；
+        # 主线程每攒够一批截图就推理，推理与剩余窗口的捕获重叠
         results = {}
+        batch = []
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="window_capture") as pool:
+            futures = [pool.submit(self._capture_window, window.id) for window in windows]
+            for window, future in zip(windows, futures):
+                try:
+                    image = future.result()
+                    if image is None:
+                        logger.warning(f"无法捕获句柄为 {window.id} 的窗口")
+                except Exception as e:
+                    logger.warning(f"捕获句柄为 {window.id} 的窗口出错: {e}")
+                    image = None
+                if image is not None:
+                    batch.append((window.title, image))
+                
+                if len(batch) >= CAPTURE_BATCH_SIZE:
+                    self._analyze_batch(batch, results)
+                    batch = []
         
-        for window in windows:
-            if window.width > 50 and window.height > 50:  # 忽略太小的窗口
-                self.window_capture.set_window_handle(window.hwnd)
-                elements = self.analyze_window_by_handle(window.hwnd)
-                if elements:
-                    results[window.title] = elements
+        if batch:
+            self._analyze_batch(batch, results)
                     
         return results
     
+    def _capture_window(self, window_id) -> Optional[Any]:
+        """用该句柄对应的捕获会话捕获窗口，不改动共享的self.window_capture"""
+        capture = self._capture_pool.get(window_id)
+        if capture is None:
+            capture = self._capture_pool.setdefault(window_id, WindowCapture())
+            capture.set_window_handle(window_id)
+        else:
+            # 句柄不变，只刷新窗口位置，避免重新设置句柄
+            capture.refresh()
+        return capture.capture()
+    
+    def close(self):
+        """释放按句柄缓存的捕获会话"""
+        self._capture_pool.clear()
+    
+    def _analyze_batch(self, batch: List[Tuple[str, Any]], results: Dict[str, List[UIElement]]):
+        """批量推理一组(标题, 截图)，把非空结果写入results"""
+        titles = [title for title, _ in batch]
+        images = [image for _, image in batch]
+        for title, elements in zip(titles, self.analyze_images(images)):
+            if elements:
+                results[title] = elements
+    
+    @staticmethod
+    def _element_arrays(elements: List[UIElement]) -> Tuple[np.ndarray, np.ndarray]:
+        """返回元素的(N,4)边界框数组和int8类型编码数组
+        
+        分析结果直接使用分析时构建的数组；其他列表（或已被修改的结果）临时构建。
+        """
+        if isinstance(elements, DetectionResult) and elements.bboxes is not None:
+            return elements.bboxes, elements.type_codes
+        bbox_arr = np.array([e.bbox for e in elements]).reshape(-1, 4)
+        type_arr = np.fromiter((_TYPE_CODES[e.type] for e in elements), dtype=np.int8, count=len(elements))
+        return bbox_arr, type_arr
+    
     def find_element_by_type(self, elements: List[UIElement], 
                            element_type: ElementType) -> List[UIElement]:
         """查找特定类型的元素"""
-        return [e for e in elements if e.type == element_type]
+        _, type_arr = self._element_arrays(elements)
+        return [elements[i] for i in np.flatnonzero(type_arr == _TYPE_CODES[element_type])]
     
     def find_element_by_position(self, elements: List[UIElement], 
                                x: int, y: int) -> Optional[UIElement]:
-        """查找特定位置的元素"""
-        for element in elements:
-            if element.contains_point(x, y):
-                return element
+        """查找特定位置的元素
+        
+        分析结果的空间索引只建一次，之后每次查找只检查一个网格；
+        元素较少、不是分析结果或结果已被修改时线性查找。
+        """
+        if (len(elements) < SPATIAL_INDEX_MIN_ELEMENTS or not isinstance(elements, DetectionResult)
+                or elements.bboxes is None):
+            for element in elements:
+                if element.contains_point(x, y):
+                    return element
+            return None
+        
+        if elements.grid is None:
+            elements.grid = build_spatial_index(elements.bboxes.tolist(), SPATIAL_INDEX_CELL)
+        
+        for i in elements.grid.get((x // SPATIAL_INDEX_CELL, y // SPATIAL_INDEX_CELL), ()):
+            if elements[i].contains_point(x, y):
+                return elements[i]
         return None
     
     def find_element_by_size(self, elements: List[UIElement], 
                            min_width: int = None, min_height: int = None,
                            max_width: int = None, max_height: int = None) -> List[UIElement]:
         """查找符合特定尺寸约束的元素"""
-        result = []
-        for element in elements:
-            if ((min_width is None or element.width >= min_width) and
-                (min_height is None or element.height >= min_height) and
-                (max_width is None or element.width <= max_width) and
-                (max_height is None or element.height <= max_height)):
-                result.append(element)
-        return result
+        arr, _ = self._element_arrays(elements)
+        w = arr[:, 2] - arr[:, 0]
+        h = arr[:, 3] - arr[:, 1]
+        
+        m = np.ones(len(elements), dtype=bool)
+        if min_width is not None:
+            m &= w >= min_width
+        if min_height is not None:
+            m &= h >= min_height
+        if max_width is not None:
+            m &= w <= max_width
+        if max_height is not None:
+            m &= h <= max_height
+        return [elements[i] for i in np.flatnonzero(m)]
     
     def find_element_by_text(self, elements: List[UIElement], text: str, 
                           case_sensitive: bool = False) -> List[UIElement]:
@@ -318,17 +642,4 @@ class UIDetector:
     @staticmethod
     def _map_class_to_type(class_idx: int) -> ElementType:
         """映射YOLO类别索引到ElementType"""
-        # 映射表可以根据模型输出类别进行扩展
-        class_map = {
-            0: ElementType.BUTTON,
-            1: ElementType.LINK,
-            2: ElementType.MENU,
-            3: ElementType.CHECKBOX,
-            4: ElementType.RADIO,
-            5: ElementType.DROPDOWN,
-            6: ElementType.INPUT,
-            7: ElementType.TAB,
-            8: ElementType.ICON,
-            9: ElementType.TEXT
-        }
-        return class_map.get(class_idx, ElementType.UNKNOWN) 
\ No newline at end of file
+        return _CLASS_TO_TYPE[class_idx] if 0 <= class_idx < len(_CLASS_TO_TYPE) else ElementType.UNKNOWN 
\ No newline at end of file
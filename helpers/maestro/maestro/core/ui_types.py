@@ -75,6 +75,18 @@ class UIElement:
             
         return True
         
+    def as_dict(self) -> Dict[str, Any]:
+        """Geometry summary (type, bbox, confidence, center, size) for JSON output"""
+        x1, y1, x2, y2 = self.bbox
+        return {
+            "type": self.type.value,
+            "bbox": self.bbox,
+            "confidence": self.confidence,
+            "center": ((x2 + x1) // 2, (y2 + y1) // 2),
+            "width": x2 - x1,
+            "height": y2 - y1
+        }
+        
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary representation"""
         return {
@@ -43,6 +43,10 @@ class WindowCapture:
         """Set window handle directly"""
         self._window_manager.set_window_handle(window_id)
     
+    def refresh(self):
+        """Re-read cached geometry/title of the current window"""
+        self._window_manager.refresh()
+    
     def get_window_rect(self) -> Tuple[int, int, int, int]:
         """Get window rectangle coordinates"""
         return self._window_manager.get_window_rect()
@@ -8,18 +8,27 @@ by the rest of the Maestro codebase.
 
 from abc import ABC, abstractmethod
 from typing import Optional, Tuple, List, Dict, Any
+import numpy as np
 from PIL import Image
 
 
+# Capture status codes returned by ScreenCaptureBase.capture_with_status()
+CAPTURE_OK = "ok"
+CAPTURE_PERMISSION_DENIED = "permission_denied"  # Retrying cannot succeed
+CAPTURE_OFF_SCREEN = "off_screen"  # Window must be brought on screen first
+CAPTURE_FAILED = "failed"  # Transient failure, worth retrying
+
+
 class WindowInfo:
     """Window information container"""
     def __init__(self, id: Any, title: str, rect: Tuple[int, int, int, int], 
-                 is_visible: bool, is_minimized: bool):
+                 is_visible: bool, is_minimized: bool, layer: int = 0):
         self.id = id  # Platform-specific window identifier
         self.title = title
         self.rect = rect  # left, top, right, bottom
         self.is_visible = is_visible
         self.is_minimized = is_minimized
+        self.layer = layer  # Window level; 0 for normal application windows
         
     @property
     def width(self) -> int:
@@ -67,6 +76,19 @@ class WindowManagerBase(ABC):
         """
         pass
     
+    @abstractmethod
+    def get_window_id(self) -> Any:
+        """Get the identifier of the current window.
+        
+        Returns:
+            Platform-specific window identifier, or None if no window is set.
+        """
+        pass
+    
+    def has_window_handle(self) -> bool:
+        """Check if a window handle is set."""
+        return self.get_window_id() is not None
+    
     @abstractmethod
     def get_window_rect(self) -> Tuple[int, int, int, int]:
         """Get window rectangle coordinates.
@@ -108,6 +130,14 @@ class WindowManagerBase(ABC):
             True if successful, False otherwise.
         """
         pass
+    
+    def refresh(self) -> None:
+        """Drop any cached geometry/title of the current window.
+        
+        Implementations may memoize window queries per handle; call this when
+        the window may have changed outside of this manager.
+        """
+        pass
 
 
 class ScreenCaptureBase(ABC):
@@ -122,6 +152,28 @@ class ScreenCaptureBase(ABC):
         """
         pass
     
+    def capture_with_status(self) -> Tuple[str, Optional[Image.Image]]:
+        """Capture current window content and report why a capture failed.
+        
+        Returns:
+            Tuple of (status, image), status being one of the CAPTURE_* codes.
+            Lets callers skip retries that cannot succeed.
+        """
+        image = self.capture()
+        return (CAPTURE_OK if image is not None else CAPTURE_FAILED), image
+    
+    def capture_window_by_id(self, window_id: Any) -> Optional[np.ndarray]:
+        """Capture a single window's pixels by its window ID.
+        
+        Args:
+            window_id: Platform-specific window identifier.
+            
+        Returns:
+            RGBA numpy array of the window content, or None if failed or
+            not supported on this platform.
+        """
+        return None
+    
     @abstractmethod
     def capture_region(self, x: int, y: int, width: int, height: int) -> Optional[Image.Image]:
         """Capture specific region of the screen.
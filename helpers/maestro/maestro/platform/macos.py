@@ -17,6 +17,7 @@ from PIL import Image, ImageOps
 import io
 
 from .base import WindowManagerBase, ScreenCaptureBase, InputControllerBase, ClipboardManagerBase, WindowInfo
+from .base import CAPTURE_OK, CAPTURE_PERMISSION_DENIED, CAPTURE_OFF_SCREEN, CAPTURE_FAILED
 
 logger = logging.getLogger("maestro.platform.macos")
 
@@ -46,40 +47,49 @@ class WindowManagerMacOS(WindowManagerBase):
         )
         
         for window_info in window_info_list:
-            window_id = window_info.get(Quartz.kCGWindowNumber)
-            window_name = window_info.get(Quartz.kCGWindowName, "")
-            owner_name = window_info.get(Quartz.kCGWindowOwnerName, "")
-            
-            # Skip windows without names
-            if not window_name and not owner_name:
-                continue
-                
-            # Get window bounds
-            bounds = window_info.get(Quartz.kCGWindowBounds, {})
-            x = bounds.get('X', 0)
-            y = bounds.get('Y', 0)
-            width = bounds.get('Width', 0)
-            height = bounds.get('Height', 0)
-            
-            # Check if window is on screen and has dimensions
-            if width > 0 and height > 0:
-                title = window_name or owner_name
-                windows.append(WindowInfo(
-                    id=window_id,
-                    title=title,
-                    rect=(int(x), int(y), int(x + width), int(y + height)),
-                    is_visible=True,
-                    is_minimized=False  # Hard to determine without additional API calls
-                ))
+            window = self._to_window_info(window_info, on_screen=True)
+            if window is not None:
+                windows.append(window)
         
         return windows
     
+    def _to_window_info(self, window_info: Dict[str, Any], on_screen: bool = False) -> Optional[WindowInfo]:
+        """Convert a Quartz window dictionary into WindowInfo, or None if it has no name or size."""
+        window_id = window_info.get(Quartz.kCGWindowNumber)
+        window_name = window_info.get(Quartz.kCGWindowName, "")
+        owner_name = window_info.get(Quartz.kCGWindowOwnerName, "")
+        
+        # Skip windows without names
+        if not window_name and not owner_name:
+            return None
+            
+        # Get window bounds
+        bounds = window_info.get(Quartz.kCGWindowBounds, {})
+        x = bounds.get('X', 0)
+        y = bounds.get('Y', 0)
+        width = bounds.get('Width', 0)
+        height = bounds.get('Height', 0)
+        
+        # Check if window is on screen and has dimensions
+        if width <= 0 or height <= 0:
+            return None
+        
+        return WindowInfo(
+            id=window_id,
+            title=window_name or owner_name,
+            rect=(int(x), int(y), int(x + width), int(y + height)),
+            is_visible=on_screen or bool(window_info.get(Quartz.kCGWindowIsOnscreen, False)),
+            is_minimized=False,  # Hard to determine without additional API calls
+            layer=int(window_info.get(Quartz.kCGWindowLayer, 0))
+        )
+    
     def find_window(self, window_title: str) -> bool:
         """Find window by title and store its handle."""
         windows = self.find_all_windows()
+        title_lower = window_title.lower()
         
         for window in windows:
-            if window_title.lower() in window.title.lower():
+            if title_lower in window.title.lower():
                 self._window_id = window.id
                 self._window_name = window.title
                 self._window_info = window
@@ -92,19 +102,29 @@ class WindowManagerMacOS(WindowManagerBase):
     def set_window_handle(self, window_id: Any) -> None:
         """Set window handle directly."""
         self._window_id = window_id
+        self.refresh()
+    
+    def refresh(self) -> None:
+        """Re-read the cached title and bounds of the current window."""
+        if self._window_id is None:
+            return
         
-        # Update window info
-        windows = self.find_all_windows()
-        for window in windows:
-            if window.id == window_id:
+        # Update window info by querying just this window instead of enumerating all of them
+        window_info_list = Quartz.CGWindowListCopyWindowInfo(
+            Quartz.kCGWindowListOptionIncludingWindow,
+            self._window_id
+        )
+        for window_info in window_info_list or ():
+            window = self._to_window_info(window_info)
+            if window is not None and window.id == self._window_id:
                 self._window_name = window.title
                 self._window_info = window
                 break
                 
-    def has_window_handle(self) -> bool:
-        """Check if a window handle is set."""
-        return self._window_id is not None
-        
+    def get_window_id(self) -> Any:
+        """Get the CGWindowID of the current window."""
+        return self._window_id
+    
     def get_window_title(self) -> str:
         """Get the title of the current window."""
         if not self._window_id:
@@ -349,6 +369,63 @@ class ScreenCaptureMacOS(ScreenCaptureBase):
             logger.error(f"Error capturing window: {e}")
             return None
     
+    def capture_with_status(self) -> Tuple[str, Optional[Image.Image]]:
+        """Capture current window content and report why a capture failed."""
+        image = self.capture()
+        if image is not None:
+            return CAPTURE_OK, image
+        
+        # Only diagnose on failure so the successful path stays a single capture
+        if hasattr(Quartz, "CGPreflightScreenCaptureAccess") and not Quartz.CGPreflightScreenCaptureAccess():
+            return CAPTURE_PERMISSION_DENIED, None
+        
+        window_id = self.window_manager._window_id
+        if window_id:
+            window_info_list = Quartz.CGWindowListCopyWindowInfo(
+                Quartz.kCGWindowListOptionIncludingWindow,
+                window_id
+            )
+            if window_info_list and not window_info_list[0].get(Quartz.kCGWindowIsOnscreen, False):
+                return CAPTURE_OFF_SCREEN, None
+        
+        return CAPTURE_FAILED, None
+    
+    def capture_window_by_id(self, window_id: Any) -> Optional[np.ndarray]:
+        """Capture just the given window's pixels as an RGBA numpy array."""
+        try:
+            # CGRectNull lets the compositor size the image to the window itself,
+            # so no screen-sized composite or crop is needed
+            image = Quartz.CGWindowListCreateImage(
+                Quartz.CGRectNull,
+                Quartz.kCGWindowListOptionIncludingWindow,
+                window_id,
+                Quartz.kCGWindowImageBoundsIgnoreFraming
+            )
+            
+            if not image:
+                logger.error("Failed to capture window image")
+                return None
+            
+            width = Quartz.CGImageGetWidth(image)
+            height = Quartz.CGImageGetHeight(image)
+            bytes_per_row = Quartz.CGImageGetBytesPerRow(image)
+            
+            # View the CGImage's backing data directly instead of redrawing it into a bitmap context
+            buffer = Quartz.CGDataProviderCopyData(Quartz.CGImageGetDataProvider(image))
+            img_data = np.frombuffer(buffer, dtype=np.uint8)
+            img_data = img_data.reshape(height, bytes_per_row)[:, :width * 4].reshape(height, width, 4)
+            
+            # Window images are usually 32-bit little-endian with alpha first, i.e. BGRA in memory
+            bitmap_info = Quartz.CGImageGetBitmapInfo(image)
+            if bitmap_info & Quartz.kCGBitmapByteOrderMask == Quartz.kCGBitmapByteOrder32Little:
+                img_data = img_data[:, :, [2, 1, 0, 3]]
+            
+            return img_data
+            
+        except Exception as e:
+            logger.error(f"Error capturing window {window_id}: {e}")
+            return None
+    
     def capture_region(self, x: int, y: int, width: int, height: int) -> Optional[Image.Image]:
         """Capture specific region of the screen."""
         try:
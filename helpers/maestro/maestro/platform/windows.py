@@ -23,12 +23,19 @@ user32 = ctypes.windll.user32
 
 logger = logging.getLogger("maestro.platform.windows")
 
+# Seconds a memoized window rect/title stays valid; bounds how stale geometry
+# can get when the user moves or resizes the window behind our back
+WINDOW_CACHE_TTL = 0.1
+
 
 class WindowManagerWindows(WindowManagerBase):
     """Windows implementation of window management operations."""
     
     def __init__(self):
         self._hwnd = None
+        # Per-handle memo of window queries: key -> (monotonic timestamp, value).
+        # Cleared whenever the handle or the window changes, and expires after WINDOW_CACHE_TTL
+        self._cache = {}
     
     def find_all_windows(self) -> List[WindowInfo]:
         """Find all visible windows."""
@@ -54,10 +61,12 @@ class WindowManagerWindows(WindowManagerBase):
     
     def find_window(self, window_title: str) -> bool:
         """Find window by title and store its handle."""
+        title_lower = window_title.lower()
+        
         def callback(hwnd, ctx):
             if win32gui.IsWindowVisible(hwnd):
                 title = win32gui.GetWindowText(hwnd)
-                if window_title.lower() in title.lower():
+                if title_lower in title.lower():
                     ctx.append(hwnd)
             return True
         
@@ -66,6 +75,7 @@ class WindowManagerWindows(WindowManagerBase):
         
         if found_windows:
             self._hwnd = found_windows[0]  # Use the first matching window
+            self._cache.clear()
             logger.debug(f"Found window handle: {self._hwnd}")
             return True
         return False
@@ -73,12 +83,35 @@ class WindowManagerWindows(WindowManagerBase):
     def set_window_handle(self, window_id: Any) -> None:
         """Set window handle directly."""
         self._hwnd = window_id
+        self._cache.clear()
+    
+    def refresh(self) -> None:
+        """Drop the cached rectangle and title of the current window."""
+        self._cache.clear()
+    
+    def _cached(self, key: str, query):
+        """Return the memoized result of query() for key, re-querying once it expires."""
+        now = time.monotonic()
+        entry = self._cache.get(key)
+        if entry is None or now - entry[0] >= WINDOW_CACHE_TTL:
+            entry = self._cache[key] = (now, query(self._hwnd))
+        return entry[1]
+    
+    def get_window_id(self) -> Any:
+        """Get the HWND of the current window."""
+        return self._hwnd
+    
+    def get_window_title(self) -> str:
+        """Get the title of the current window."""
+        if not self._hwnd:
+            return ""
+        return self._cached("title", win32gui.GetWindowText)
     
     def get_window_rect(self) -> Tuple[int, int, int, int]:
         """Get window rectangle coordinates."""
         if not self._hwnd:
             raise ValueError("No window handle set")
-        return win32gui.GetWindowRect(self._hwnd)
+        return self._cached("rect", win32gui.GetWindowRect)
     
     def get_client_rect(self) -> Tuple[int, int, int, int]:
         """Get client area rectangle coordinates."""
@@ -103,6 +136,8 @@ class WindowManagerWindows(WindowManagerBase):
         # Ensure window is in foreground
         win32gui.SetForegroundWindow(self._hwnd)
         time.sleep(0.1)
+        # Restoring may have moved the window
+        self._cache.clear()
         return True
     
     def move_window(self, x: int, y: int, width: int, height: int) -> bool:
@@ -111,6 +146,7 @@ class WindowManagerWindows(WindowManagerBase):
             return False
         try:
             win32gui.MoveWindow(self._hwnd, x, y, width, height, True)
+            self._cache.clear()
             return True
         except Exception as e:
             logger.error(f"Error moving window: {e}")
@@ -3,6 +3,7 @@ Maestro CLI工具 - 简化版
 """
 
 import argparse
+import contextlib
 import win32gui
 import win32process
 import win32con
@@ -21,7 +22,7 @@ try:
     from ui_ctrl_v2.input_controller import InputController
     UI_CTRL_V2_AVAILABLE = True
 except ImportError:
-    print("警告: ui_ctrl_v2模块不可用，部分功能将受限")
+    print("警告: ui_ctrl_v2模块不可用，部分功能将受限", file=sys.stderr)
     UI_CTRL_V2_AVAILABLE = False
 
 # 全局变量
@@ -112,7 +113,8 @@ def find_window_by_pid(pid):
 def find_window(window_title):
     """查找指定标题的窗口"""
     windows = list_windows()
-    matching_windows = [w for w in windows if window_title.lower() in w[1].lower()]
+    title_lower = window_title.lower()
+    matching_windows = [w for w in windows if title_lower in w[1].lower()]
     return matching_windows[0] if matching_windows else None
 
 def detail_window(window_identifier, output_file=None, save_screenshot=False, fast_mode=False, verbose=True, id_type="title"):
@@ -152,7 +154,8 @@ def detail_window(window_identifier, output_file=None, save_screenshot=False, fa
     else:  # 默认使用标题
         # 首先列出匹配的窗口
         windows = list_windows()
-        matching_windows = [w for w in windows if window_identifier.lower() in w[1].lower()]
+        identifier_lower = window_identifier.lower()
+        matching_windows = [w for w in windows if identifier_lower in w[1].lower()]
         
         if not matching_windows:
             if verbose:
@@ -445,81 +448,120 @@ def send_text_to_window(hwnd, text):
         print(f"发送文本到窗口失败: {e}")
         return False
 
+def run_key_operation(hwnd, title, action, keys, no_activate=False):
+    """在已找到的窗口上执行单个键盘操作 (type, key, hotkey)，返回是否执行成功"""
+    if action == "type":
+        if keys:
+            if no_activate:
+                # 直接发送文本到窗口，无需激活
+                print(f"直接向窗口 '{title}' 发送文本: {keys}")
+                success = send_text_to_window(hwnd, keys)
+                if success:
+                    print("文本发送成功")
+                else:
+                    print("文本发送失败")
+                return success
+            else:
+                # 传统方式：先激活窗口再输入
+                input_controller = get_input_controller()
+                input_controller.activate_window(hwnd)
+                time.sleep(0.5)  # 等待窗口激活
+                print(f"在窗口 '{title}' 中输入文本: {keys}")
+                input_controller.type_text(keys)
+                return True
+        else:
+            print("缺少要输入的文本")
+
+    elif action == "key":
+        if keys:
+            # 按下特定按键 (需要激活窗口)
+            if UI_CTRL_V2_AVAILABLE:
+                input_controller = get_input_controller()
+                input_controller.activate_window(hwnd)
+                time.sleep(0.5)
+                print(f"在窗口 '{title}' 中按下按键: {keys}")
+                input_controller.press_key(keys)
+                return True
+            else:
+                print("ui_ctrl_v2模块不可用，无法执行按键操作")
+        else:
+            print("缺少要按下的按键")
+
+    elif action == "hotkey":
+        if keys:
+            # 按下组合键 (需要激活窗口)
+            if UI_CTRL_V2_AVAILABLE:
+                input_controller = get_input_controller()
+                input_controller.activate_window(hwnd)
+                time.sleep(0.5)
+                key_list = keys.split('+')
+                print(f"在窗口 '{title}' 中按下组合键: {keys}")
+                input_controller.press_hotkey(key_list)
+                return True
+            else:
+                print("ui_ctrl_v2模块不可用，无法执行组合键操作")
+        else:
+            print("缺少要按下的组合键")
+
+    else:
+        print(f"不支持的键盘操作: {action}")
+
+    return False
+
+def run_key_sequence(hwnd, title, steps, no_activate=False):
+    """在同一进程内依次执行一组键盘操作
+
+    每一步是一个字典:
+        {"op": "type", "text": "...", "no_activate": true}
+        {"op": "key", "value": "Return"}
+        {"op": "hotkey", "value": "ctrl+s"}
+        {"op": "sleep", "ms": 500}
+    遇到失败的步骤立即停止并返回False
+    """
+    for step in steps:
+        op = step.get("op")
+        if op == "sleep":
+            time.sleep(step.get("ms", 0) / 1000)
+            continue
+        keys = step.get("text") if op == "type" else step.get("value")
+        if not run_key_operation(hwnd, title, op, keys, step.get("no_activate", no_activate)):
+            return False
+    return True
+
 def keyboard_action(window_title, action, keys=None, no_activate=False):
     """执行键盘操作
 
     参数:
         window_title: 窗口标题
-        action: 操作类型 (type, key, hotkey)
-        keys: 要输入的内容
+        action: 操作类型 (type, key, hotkey, sequence)
+        keys: 要输入的内容；sequence操作时为步骤列表或其JSON字符串
         no_activate: 是否不激活窗口直接发送 (仅对type操作有效)
     """
-    if not UI_CTRL_V2_AVAILABLE and not no_activate:
+    # sequence中的每一步各自判断是否需要ui_ctrl_v2
+    if not UI_CTRL_V2_AVAILABLE and not no_activate and action != "sequence":
         print("ui_ctrl_v2模块不可用，无法执行键盘操作")
-        return
+        return False
 
     window_info = find_window(window_title)
     if not window_info:
         print(f"没有找到标题包含 '{window_title}' 的窗口")
-        return
+        return False
 
     hwnd, title, pid = window_info
 
     try:
-        if action == "type":
-            if keys:
-                if no_activate:
-                    # 直接发送文本到窗口，无需激活
-                    print(f"直接向窗口 '{title}' 发送文本: {keys}")
-                    success = send_text_to_window(hwnd, keys)
-                    if success:
-                        print("文本发送成功")
-                    else:
-                        print("文本发送失败")
-                else:
-                    # 传统方式：先激活窗口再输入
-                    input_controller = get_input_controller()
-                    input_controller.activate_window(hwnd)
-                    time.sleep(0.5)  # 等待窗口激活
-                    print(f"在窗口 '{title}' 中输入文本: {keys}")
-                    input_controller.type_text(keys)
-            else:
-                print("缺少要输入的文本")
-
-        elif action == "key":
-            if keys:
-                # 按下特定按键 (需要激活窗口)
-                if UI_CTRL_V2_AVAILABLE:
-                    input_controller = get_input_controller()
-                    input_controller.activate_window(hwnd)
-                    time.sleep(0.5)
-                    print(f"在窗口 '{title}' 中按下按键: {keys}")
-                    input_controller.press_key(keys)
-                else:
-                    print("ui_ctrl_v2模块不可用，无法执行按键操作")
-            else:
-                print("缺少要按下的按键")
-
-        elif action == "hotkey":
-            if keys:
-                # 按下组合键 (需要激活窗口)
-                if UI_CTRL_V2_AVAILABLE:
-                    input_controller = get_input_controller()
-                    input_controller.activate_window(hwnd)
-                    time.sleep(0.5)
-                    key_list = keys.split('+')
-                    print(f"在窗口 '{title}' 中按下组合键: {keys}")
-                    input_controller.press_hotkey(key_list)
-                else:
-                    print("ui_ctrl_v2模块不可用，无法执行组合键操作")
-            else:
-                print("缺少要按下的组合键")
-
-        else:
-            print(f"不支持的键盘操作: {action}")
+        if action == "sequence":
+            steps = json.loads(keys) if isinstance(keys, str) else keys
+            if not isinstance(steps, list):
+                print("sequence操作需要一个JSON数组")
+                return False
+            return run_key_sequence(hwnd, title, steps, no_activate)
+        return run_key_operation(hwnd, title, action, keys, no_activate)
     except Exception as e:
         print(f"执行键盘操作时出错: {e}")
 
+    return False
+
 def analyze_augment(window_title: str, output_file=None):
     """分析VSCode窗口中的augment对话内容"""
     window_info = find_window(window_title)
@@ -622,9 +664,47 @@ def analyze_augment(window_title: str, output_file=None):
         print("\n推断状态: 无需回复continue")
         return "no_action_needed"
 
+def handle_daemon_request(request):
+    """处理守护进程模式下的单条JSON请求，返回可序列化的响应字典"""
+    cmd = request.get("cmd")
+    
+    if cmd == "list":
+        windows = list_windows()
+        return {"ok": True, "windows": [[hwnd, title, pid] for hwnd, title, pid in windows]}
+    
+    if cmd in ("type", "key", "hotkey", "sequence"):
+        window_title = request.get("window")
+        if not window_title:
+            return {"ok": False, "error": "缺少window参数"}
+        ok = keyboard_action(window_title, cmd, request.get("keys"), bool(request.get("no_activate", False)))
+        return {"ok": bool(ok)}
+    
+    return {"ok": False, "error": f"不支持的命令: {cmd}"}
+
+def run_daemon():
+    """守护进程模式：从stdin逐行读取JSON命令，向stdout逐行写出JSON响应
+    
+    调用方只需启动一次进程即可连续发送多条命令，避免每次操作都重新启动解释器。
+    命令执行期间的普通输出被重定向到stderr，stdout只承载协议响应。
+    """
+    protocol_out = sys.stdout
+    for line in sys.stdin:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            request = json.loads(line)
+            with contextlib.redirect_stdout(sys.stderr):
+                response = handle_daemon_request(request)
+        except Exception as e:
+            response = {"ok": False, "error": str(e)}
+        protocol_out.write(json.dumps(response) + "\n")
+        protocol_out.flush()
+
 def main():
     """CLI主入口"""
     parser = argparse.ArgumentParser(description="Maestro CLI工具")
+    parser.add_argument("--daemon", action="store_true", help="守护进程模式，从stdin逐行读取JSON命令")
     subparsers = parser.add_subparsers(dest="command", help="可用命令")
     
     # list命令
@@ -661,8 +741,8 @@ def main():
     # keyboard命令
     keyboard_parser = subparsers.add_parser("keyboard", help="执行键盘操作")
     keyboard_parser.add_argument("window_title", help="窗口标题")
-    keyboard_parser.add_argument("action", choices=["type", "key", "hotkey"], help="键盘操作")
-    keyboard_parser.add_argument("keys", help="要输入的文本、按键或组合键")
+    keyboard_parser.add_argument("action", choices=["type", "key", "hotkey", "sequence"], help="键盘操作")
+    keyboard_parser.add_argument("keys", help="要输入的文本、按键或组合键；sequence操作时为JSON步骤数组")
     keyboard_parser.add_argument("--no-activate", action="store_true", help="直接发送文本到窗口，无需激活 (仅对type操作有效)")
     
     # analyze_augment命令
@@ -672,7 +752,10 @@ def main():
     
     args = parser.parse_args()
     
-    if args.command == "list":
+    if args.daemon:
+        run_daemon()
+    
+    elif args.command == "list":
         windows = list_windows()
         print(f"找到 {len(windows)} 个窗口:")
         for hwnd, title, pid in windows:
@@ -717,7 +800,8 @@ def main():
         mouse_action(args.window_title, args.action, args.x, args.y, args.button, args.double, args.element)
     
     elif args.command == "keyboard":
-        keyboard_action(args.window_title, args.action, args.keys, getattr(args, 'no_activate', False))
+        if not keyboard_action(args.window_title, args.action, args.keys, getattr(args, 'no_activate', False)):
+            sys.exit(1)
     
     elif args.command == "analyze_augment":
         analyze_augment(args.window_title, args.output)
@@ -60,6 +60,9 @@ class MaestroCore:
         self._ui_cache_time = 0
         self._window_rect = None
         
+        # 预分配的截图缓冲区，按需增大，避免每次截图都分配一块窗口大小的内存
+        self._capture_buffer = None
+        
         # UI元素位置
         self.dialog_area = None
         self.input_area = None
@@ -191,8 +194,23 @@ class MaestroCore:
         logger.info("使用固定UI元素位置")
         return False
     
+    def capture_window_by_id(self):
+        """按窗口ID直接从合成器捕获当前窗口，不需要先激活窗口
+        
+        Returns:
+            RGBA numpy数组；未找到窗口或当前平台不支持时返回None，调用方可改用capture_window()
+        """
+        window_id = self._window_manager.get_window_id()
+        if window_id is None:
+            logger.warning("未找到窗口，无法捕获截图")
+            return None
+        return self._screen_capture.capture_window_by_id(window_id)
+    
     def capture_window(self):
-        """捕获窗口截图"""
+        """捕获窗口截图
+        
+        返回的数组是内部截图缓冲区的视图，下次截图时会被覆盖，需要保留时请先copy()
+        """
         if not self._window_manager.has_window_handle():
             logger.warning("未找到窗口，无法捕获截图")
             return None
@@ -214,8 +232,18 @@ class MaestroCore:
                 logger.error("捕获窗口失败")
                 return None
                 
-            # 转换为numpy数组
-            image = np.array(img)
+            # 复制到复用的缓冲区中，窗口变大时才重新分配
+            src = np.asarray(img)
+            height, width = src.shape[:2]
+            buffer = self._capture_buffer
+            if buffer is None or buffer.shape[0] < height or buffer.shape[1] < width or buffer.shape[2:] != src.shape[2:]:
+                if buffer is not None and buffer.shape[2:] == src.shape[2:]:
+                    height_alloc, width_alloc = max(height, buffer.shape[0]), max(width, buffer.shape[1])
+                else:
+                    height_alloc, width_alloc = height, width
+                buffer = self._capture_buffer = np.empty((height_alloc, width_alloc) + src.shape[2:], dtype=np.uint8)
+            image = buffer[:height, :width]
+            np.copyto(image, src)
             
             # 如果是调试模式，保存截图
             if self.debug_mode:
@@ -467,7 +495,7 @@ class MaestroCore:
         
         Args:
             timeout: 超时时间（秒）
-            check_interval: 检查间隔（秒）
+            check_interval: 最大检查间隔（秒），检查间隔从5毫秒开始逐次翻倍到该值
         """
         if not self._window_manager.has_window_handle():
             logger.warning("未找到窗口，无法等待响应")
@@ -479,9 +507,11 @@ class MaestroCore:
         initial_content = self.get_dialog_content()
         
         start_time = time.time()
+        delay = 0.005
         while time.time() - start_time < timeout:
-            # 等待一段时间
-            time.sleep(check_interval)
+            # 自适应退避：响应快时尽早发现，响应慢时减少无谓的截图
+            time.sleep(delay)
+            delay = min(delay * 2, check_interval)
             
             # 读取当前对话内容
             current_content = self.get_dialog_content()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Background PNG writer for captured window images.
+
+Encoding runs on a single worker thread so capture scripts can keep going
+while the file is written. OpenCV's encoder releases the GIL and is used when
+available; otherwise Pillow is used.
+"""
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from PIL import Image
+
+try:
+    import cv2
+    CV2_AVAILABLE = True
+except ImportError:
+    CV2_AVAILABLE = False
+
+logger = logging.getLogger("maestro_test")
+
+# One worker keeps writes ordered
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="png_writer")
+
+# Images queued or being written at once; save_png_async blocks beyond this,
+# so a fast capture loop cannot pile up unbounded frames in memory
+MAX_PENDING_WRITES = 4
+_pending = threading.BoundedSemaphore(MAX_PENDING_WRITES)
+
+def _write_png(image, filename, label):
+    """Encode and write one image, logging where it was saved."""
+    if isinstance(image, Image.Image):
+        image.save(filename)
+    elif CV2_AVAILABLE:
+        # Captures are RGB(A); OpenCV expects BGR(A)
+        if image.ndim == 3 and image.shape[2] == 4:
+            image = cv2.cvtColor(image, cv2.COLOR_RGBA2BGRA)
+        elif image.ndim == 3 and image.shape[2] == 3:
+            image = cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
+        if not cv2.imwrite(filename, image):
+            raise IOError(f"cv2.imwrite failed for {filename}")
+    else:
+        Image.fromarray(np.asarray(image)).save(filename)
+    logger.info(f"{label} saved to {filename}")
+    return filename
+
+def save_png_async(image, filename, label="Capture"):
+    """Queue a numpy array or PIL Image to be written as PNG.
+
+    Blocks while MAX_PENDING_WRITES images are already waiting to be written.
+
+    Returns:
+        concurrent.futures.Future resolving to the filename; call result()
+        to wait for the write and re-raise any encoding error.
+    """
+    _pending.acquire()
+    try:
+        future = _executor.submit(_write_png, image, filename, label)
+    except BaseException:
+        _pending.release()
+        raise
+    future.add_done_callback(lambda _: _pending.release())
+    return future
@@ -0,0 +1,28 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Polling helper shared by the VSCode test and interaction scripts.
+"""
+
+import time
+
+def wait_until(condition, timeout=0.5, interval=0.005):
+    """Poll condition every interval seconds until it is true or timeout expires.
+
+    Used in place of fixed sleeps after actions whose effect can be observed.
+
+    Args:
+        condition: Callable taking no arguments; a truthy result ends the wait
+        timeout: Maximum time to wait in seconds
+        interval: Delay between polls in seconds
+
+    Returns:
+        bool: Whether the condition became true before the timeout
+    """
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(interval)
+    return True
@@ -0,0 +1,59 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from analyze_stdout import ELEMENT_PATTERN, parse_elements_from_output, find_augment_dialog_elements
+
+SAMPLE_OUTPUT = """窗口: Visual Studio Code
+检测到 4 个元素
+元素 1: 类型=button, 位置=(10, 20, 110, 60), 置信度=0.87
+元素 2: 类型=text, 位置=(0, 100, 200, 200), 置信度=0.5
+无关的输出行
+元素 3: 类型=text, 位置=(0, 300, 300, 400), 置信度=0.92
+元素 x: 类型=text, 位置=(0, 0, 1, 1), 置信度=0.1
+元素 4: 类型=text, 位置=(0, 500, 50, 520), 置信度=0.3
+"""
+
+def test_pattern_groups():
+    """命名分组取出元素的各个字段"""
+    match = ELEMENT_PATTERN.search("元素 12: 类型=scrollbar, 位置=(1, 2, 3, 4), 置信度=0.75")
+    assert match is not None
+    assert match.group('id') == '12'
+    assert match.group('type') == 'scrollbar'
+    assert [match.group(k) for k in ('x1', 'y1', 'x2', 'y2')] == ['1', '2', '3', '4']
+    assert match.group('confidence') == '0.75'
+
+def test_pattern_rejects_malformed_lines():
+    """格式不符的行不匹配"""
+    assert ELEMENT_PATTERN.search("元素 x: 类型=text, 位置=(0, 0, 1, 1), 置信度=0.1") is None
+    assert ELEMENT_PATTERN.search("元素 1: 类型=text, 位置=(0, 0, 1), 置信度=0.1") is None
+
+def test_parse_elements_from_output():
+    """只解析元素行，跳过其他输出和格式不符的行"""
+    elements = parse_elements_from_output(SAMPLE_OUTPUT)
+    assert len(elements) == 4
+    assert list(elements.ids) == [1, 2, 3, 4]
+    assert list(elements.types) == ['button', 'text', 'text', 'text']
+    assert elements.bboxes.shape == (4, 4)
+    assert list(elements.bboxes[0]) == [10, 20, 110, 60]
+    assert abs(float(elements.conf[2]) - 0.92) < 1e-6
+    assert list(elements.areas) == [4000, 20000, 30000, 1000]
+
+def test_parse_elements_from_lines():
+    """逐行的可迭代输入与完整字符串结果一致"""
+    from_lines = parse_elements_from_output(iter(SAMPLE_OUTPUT.splitlines(keepends=True)))
+    from_text = parse_elements_from_output(SAMPLE_OUTPUT)
+    assert list(from_lines.ids) == list(from_text.ids)
+    assert (from_lines.bboxes == from_text.bboxes).all()
+
+def test_parse_empty_output():
+    """没有输出时得到空的元素集合"""
+    for output in ("", None):
+        elements = parse_elements_from_output(output)
+        assert len(elements) == 0
+        assert elements.bboxes.shape == (0, 4)
+
+def test_find_augment_dialog_elements():
+    """大型文本元素按面积从大到小排列"""
+    elements = parse_elements_from_output(SAMPLE_OUTPUT)
+    assert list(elements.ids[find_augment_dialog_elements(elements)]) == [3, 2]
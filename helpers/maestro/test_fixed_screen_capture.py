@@ -54,7 +54,9 @@ def main():
     ]
     
     for window in windows:
-        is_vscode = any(pattern.lower() in window.title.lower() for pattern in vscode_patterns)
+        # Patterns are already lowercase; lower each title once
+        title_lower = window.title.lower()
+        is_vscode = any(pattern in title_lower for pattern in vscode_patterns)
         if is_vscode:
             vscode_windows.append(window)
         else:
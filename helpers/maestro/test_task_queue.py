@@ -0,0 +1,107 @@
+import json
+import os
+import sys
+import types
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+# interact_with_augment依赖pywin32，测试不连接VSCode窗口，替换为空模块以便在任何平台上导入auto_task
+sys.modules.setdefault("interact_with_augment", types.SimpleNamespace(AugmentInteractor=None))
+from auto_task import TaskAutomator
+
+class RecordingInteractor:
+    """记录发送的消息，代替真实的AugmentInteractor"""
+    def __init__(self):
+        self.messages = []
+
+    def send_message(self, message):
+        self.messages.append(message)
+        return True
+
+def make_task(task_id, priority, status="待处理"):
+    return {
+        "id": task_id,
+        "description": f"描述 {task_id}",
+        "status": status,
+        "priority": priority,
+        "created_at": "2024-01-01 00:00:00",
+        "updated_at": "2024-01-01 00:00:00"
+    }
+
+def make_automator(tmp_path, tasks):
+    """从临时目录中的任务文件创建执行器，Markdown也写到临时目录"""
+    tasks_file = tmp_path / "tasks.json"
+    tasks_file.write_text(json.dumps(tasks, ensure_ascii=False), encoding="utf-8")
+    return TaskAutomator(tasks_file=str(tasks_file), output_md=str(tmp_path / "running.md"),
+                         interactor=RecordingInteractor())
+
+def load_saved(automator):
+    with open(automator.tasks_file, encoding="utf-8") as f:
+        return {task["id"]: task for task in json.load(f)}
+
+def drain(automator):
+    """按get_next_task的顺序依次取出所有待处理任务"""
+    order = []
+    while True:
+        task = automator.get_next_task()
+        if task is None:
+            return order
+        order.append(task["id"])
+        automator.update_task(task["id"], status="已完成")
+
+def test_priority_then_insertion_order(tmp_path):
+    """优先级高的先出，同优先级按添加顺序"""
+    automator = make_automator(tmp_path, [
+        make_task("task_1", 1), make_task("task_2", 5), make_task("task_3", 1),
+        make_task("task_4", 5), make_task("task_5", 9, status="已完成"),
+    ])
+    assert drain(automator) == ["task_2", "task_4", "task_1", "task_3"]
+
+def test_lazy_deletion_of_stale_entries(tmp_path):
+    """优先级或状态变化后，堆中的旧条目在取出时被丢弃"""
+    automator = make_automator(tmp_path, [
+        make_task("task_1", 1), make_task("task_2", 5), make_task("task_3", 3),
+    ])
+    automator.update_task("task_2", priority=0)
+    automator.update_task("task_3", status="进行中")
+    assert automator.get_next_task()["id"] == "task_1"
+
+    # 重新设为待处理后再次入堆
+    automator.update_task("task_3", status="待处理")
+    assert drain(automator) == ["task_3", "task_1", "task_2"]
+
+def test_add_tasks_batch(tmp_path):
+    """批量添加的任务共用一个时间戳并进入优先级堆，添加后已保存"""
+    automator = make_automator(tmp_path, [make_task("task_1", 2)])
+    tasks = automator.add_tasks([("低", 1), ("高", 7), ("中", 2)])
+    assert [task["id"] for task in tasks] == ["task_2", "task_3", "task_4"]
+    assert len({task["created_at"] for task in tasks}) == 1
+
+    assert list(load_saved(automator)) == ["task_1", "task_2", "task_3", "task_4"]
+    assert os.path.exists(automator.output_md)
+    assert drain(automator) == ["task_3", "task_1", "task_4", "task_2"]
+
+def test_update_tasks_batch(tmp_path):
+    """批量更新跳过不存在的任务，返回成功更新的ID，更新后已保存"""
+    automator = make_automator(tmp_path, [
+        make_task("task_1", 1), make_task("task_2", 2), make_task("task_3", 3),
+    ])
+    updated = automator.update_tasks([
+        ("task_1", {"priority": 10}),
+        ("task_9", {"status": "已完成"}),
+        ("task_3", {"status": "已完成"}),
+    ])
+    assert updated == ["task_1", "task_3"]
+
+    saved = load_saved(automator)
+    assert saved["task_1"]["priority"] == 10
+    assert saved["task_3"]["status"] == "已完成"
+    assert drain(automator) == ["task_1", "task_2"]
+
+def test_execute_task_sends_and_completes(tmp_path):
+    """执行任务时通过交互器发送消息，随后标记为已完成"""
+    automator = make_automator(tmp_path, [make_task("task_1", 1), make_task("task_2", 3)])
+    assert automator.execute_task()
+    assert automator.interactor.messages == ["请执行以下任务：描述 task_2"]
+    assert load_saved(automator)["task_2"]["status"] == "已完成"
+    assert automator.get_next_task()["id"] == "task_1"
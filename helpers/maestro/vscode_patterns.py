@@ -0,0 +1,31 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Shared VSCode window title patterns for the macOS test scripts.
+"""
+
+import re
+
+# Lowercased title fragments that identify a VSCode window
+VSCODE_PATTERNS = (
+    "visual studio code",
+    "code - oss",
+    "code",
+    ".py —",
+    ".js —",
+    ".html —",
+    ".css —",
+    ".md —",
+    "— code",
+    "☁️ remote agent",
+    "workspace",
+    "vscode"
+)
+
+# Compiled once so each title is matched in a single regex pass instead of one substring scan per pattern
+VSCODE_PATTERN_RE = re.compile("|".join(map(re.escape, VSCODE_PATTERNS)), re.IGNORECASE)
+
+def is_vscode_title(title: str) -> bool:
+    """Return True if the window title looks like a VSCode window."""
+    return VSCODE_PATTERN_RE.search(title) is not None
@@ -0,0 +1,60 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+import element_records
+
+def make_element(element_type, x1, y1, x2, y2, confidence=0.5):
+    return {
+        'type': element_type,
+        'confidence': confidence,
+        'position': {'x1': x1, 'y1': y1, 'x2': x2, 'y2': y2}
+    }
+
+def test_to_records_keeps_long_type_names():
+    """类型字段宽度由数据决定，长类型名不被截断"""
+    records = element_records.to_records([
+        make_element('scrollbar_horizontal', 0, 0, 10, 10),
+        make_element('button', 0, 0, 10, 10),
+    ])
+    assert list(records.type) == ['scrollbar_horizontal', 'button']
+
+def test_to_records_rounds_coordinates():
+    """浮点坐标四舍五入到整数像素，而不是截断"""
+    records = element_records.to_records([make_element('text', 1.9, 2.2, 10.5, 20.7)])
+    assert (records.x1[0], records.y1[0], records.x2[0], records.y2[0]) == (2, 2, 10, 21)
+    assert records.x1.dtype == np.int32
+
+def test_to_records_defaults_and_geometry():
+    """缺失字段取默认值，宽高和面积按列计算"""
+    records = element_records.to_records([{}, make_element('icon', 10, 20, 40, 60, 0.75)])
+    assert records.type[0] == '' and records.conf[0] == 0
+    assert list(element_records.widths(records)) == [0, 30]
+    assert list(element_records.heights(records)) == [0, 40]
+    assert list(element_records.areas(records)) == [0, 1200]
+
+def test_to_records_empty():
+    """空元素列表得到空记录数组"""
+    records = element_records.to_records([])
+    assert len(records) == 0
+    assert not element_records.contained_in_any(records, [(0, 0, 100, 100)]).any()
+
+@pytest.mark.parametrize('use_numba', [True, False], ids=['numba', 'numpy'])
+def test_contained_in_any(monkeypatch, use_numba):
+    """元素完全位于任一区域内时为真，numba内核与NumPy广播实现结果一致"""
+    if use_numba and not element_records.NUMBA_AVAILABLE:
+        pytest.skip("numba未安装")
+    monkeypatch.setattr(element_records, 'NUMBA_AVAILABLE', use_numba)
+    records = element_records.to_records([
+        make_element('text', 5, 5, 10, 10),      # 在第一个区域内
+        make_element('text', 0, 0, 100, 10),     # 超出所有区域
+        make_element('text', 55, 5, 60, 50),     # 在第二个区域内
+        make_element('text', 20, 20, 20, 20),    # 恰好落在第一个区域边界上
+    ])
+    boxes = [(0, 0, 20, 20), (50, 0, 60, 60)]
+    assert list(element_records.contained_in_any(records, boxes)) == [True, False, True, True]
+    # 单个区域也可以直接传入
+    assert list(element_records.contained_in_any(records, (0, 0, 20, 20))) == [True, False, False, True]
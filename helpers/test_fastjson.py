@@ -0,0 +1,42 @@
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+import fastjson
+
+SAMPLE = {
+    'window': {'title': '文件 - Visual Studio Code', 'rect': [0, 0, 1920, 1080]},
+    'elements': [
+        {'id': 1, 'type': 'button', 'confidence': 0.87,
+         'position': {'x1': 10, 'y1': 20, 'x2': 110, 'y2': 60}},
+    ],
+}
+
+@pytest.fixture(params=[True, False], ids=['orjson', 'json'])
+def use_orjson(request, monkeypatch):
+    """分别用orjson和标准库json回退运行"""
+    if request.param and not fastjson.ORJSON_AVAILABLE:
+        pytest.skip("orjson未安装")
+    monkeypatch.setattr(fastjson, 'ORJSON_AVAILABLE', request.param)
+    return request.param
+
+def test_load_matches_json(tmp_path, use_orjson):
+    """两种实现的解析结果与json.dumps的输入一致"""
+    path = tmp_path / 'analysis.json'
+    path.write_text(json.dumps(SAMPLE, ensure_ascii=False), encoding='utf-8')
+    assert fastjson.load(str(path)) == SAMPLE
+
+def test_empty_file_raises_json_error(tmp_path, use_orjson):
+    """空文件无法mmap，两种实现都给出JSONDecodeError"""
+    path = tmp_path / 'empty.json'
+    path.write_bytes(b'')
+    with pytest.raises(json.JSONDecodeError):
+        fastjson.load(str(path))
+
+def test_missing_file_raises(tmp_path, use_orjson):
+    """文件不存在时抛出FileNotFoundError，调用方据此跳过分析"""
+    with pytest.raises(FileNotFoundError):
+        fastjson.load(str(tmp_path / 'missing.json'))
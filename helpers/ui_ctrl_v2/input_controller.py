@@ -66,6 +66,13 @@ VK_CODES = {
     'f12': 0x7B,
 }
 
+# Mouse button -> (down flag, up flag)
+BUTTON_FLAGS = {
+    'left': (MOUSEEVENTF_LEFTDOWN, MOUSEEVENTF_LEFTUP),
+    'right': (MOUSEEVENTF_RIGHTDOWN, MOUSEEVENTF_RIGHTUP),
+    'middle': (MOUSEEVENTF_MIDDLEDOWN, MOUSEEVENTF_MIDDLEUP),
+}
+
 # Windows API structures
 class POINT(ctypes.Structure):
     _fields_ = [("x", ctypes.c_long), ("y", ctypes.c_long)]
@@ -109,82 +116,106 @@ class INPUT(ctypes.Structure):
         ("union", INPUT_UNION)
     ]
 
+# Shared dwExtraInfo value for every injected event, so no pointer is allocated per event
+_EXTRA = ctypes.c_ulong(0)
+_EXTRA_PTR = ctypes.pointer(_EXTRA)
+
+# Bind the hot user32 entry points once with explicit signatures so ctypes skips per-call
+# argument probing. A private WinDLL keeps these argtypes from leaking into ctypes.windll.user32.
+_user32 = ctypes.WinDLL("user32", use_last_error=True)
+_SendInput = _user32.SendInput
+_SendInput.argtypes = (wintypes.UINT, ctypes.POINTER(INPUT), ctypes.c_int)
+_SendInput.restype = wintypes.UINT
+_GetCursorPos = _user32.GetCursorPos
+_GetCursorPos.argtypes = (ctypes.POINTER(POINT),)
+_GetCursorPos.restype = wintypes.BOOL
+
+# Window activation calls, resolved once instead of per activate_window call
+_IsIconic = win32gui.IsIconic
+_ShowWindow = win32gui.ShowWindow
+_SetForegroundWindow = win32gui.SetForegroundWindow
+_GetForegroundWindow = win32gui.GetForegroundWindow
+
 class InputController:
     """Input control for mouse and keyboard"""
     
     def __init__(self):
         """Initialize input controller"""
         self.user32 = ctypes.windll.user32
+        self.invalidate_screen_size()
+        
+        # Reusable INPUT slots (enough for a move plus a double click), filled in place before each SendInput
+        self._inputs = (INPUT * 5)()
+        
+    def invalidate_screen_size(self):
+        """Re-read screen size, e.g. after a display or DPI change"""
+        self._screen_width = win32api.GetSystemMetrics(win32con.SM_CXSCREEN)
+        self._screen_height = win32api.GetSystemMetrics(win32con.SM_CYSCREEN)
+        # Scale factors to normalized absolute coordinates (0-65535)
+        self._kx = 65535.0 / self._screen_width
+        self._ky = 65535.0 / self._screen_height
+        
+    def _fill_mouse(self, idx: int, dx: int, dy: int, flags: int):
+        """Fill preallocated INPUT slot idx with a mouse event"""
+        command = self._inputs[idx]
+        command.type = INPUT_MOUSE
+        mi = command.union.mi
+        mi.dx = dx
+        mi.dy = dy
+        mi.mouseData = 0
+        mi.dwFlags = flags
+        mi.time = 0
+        mi.dwExtraInfo = _EXTRA_PTR
         
     def get_cursor_position(self) -> Tuple[int, int]:
         """Get current cursor position"""
         point = POINT()
-        self.user32.GetCursorPos(ctypes.byref(point))
+        _GetCursorPos(ctypes.byref(point))
         return (point.x, point.y)
         
     def set_cursor_position(self, x: int, y: int):
         """Set cursor position"""
-        # Convert to normalized coordinates (0-65535)
-        screen_width = win32api.GetSystemMetrics(win32con.SM_CXSCREEN)
-        screen_height = win32api.GetSystemMetrics(win32con.SM_CYSCREEN)
-        
-        nx = int(65535 * (x / screen_width))
-        ny = int(65535 * (y / screen_height))
-        
-        # Prepare input structure
-        extra = ctypes.c_ulong(0)
-        ii = INPUT_UNION()
-        ii.mi = MOUSEINPUT(nx, ny, 0, MOUSEEVENTF_MOVE | MOUSEEVENTF_ABSOLUTE, 0, ctypes.pointer(extra))
-        command = INPUT(INPUT_MOUSE, ii)
+        # Convert to normalized coordinates (0-65535) using the cached screen size
+        nx = int(x * self._kx)
+        ny = int(y * self._ky)
         
         # Send input
-        self.user32.SendInput(1, ctypes.byref(command), ctypes.sizeof(command))
+        self._fill_mouse(0, nx, ny, MOUSEEVENTF_MOVE | MOUSEEVENTF_ABSOLUTE)
+        _SendInput(1, self._inputs, ctypes.sizeof(INPUT))
         logger.debug(f"Set cursor position to ({x}, {y})")
         
-    def mouse_click(self, button: str = "left", double: bool = False):
-        """Perform mouse click"""
-        # Map button to flags
-        if button == "left":
-            down_flag = MOUSEEVENTF_LEFTDOWN
-            up_flag = MOUSEEVENTF_LEFTUP
-        elif button == "right":
-            down_flag = MOUSEEVENTF_RIGHTDOWN
-            up_flag = MOUSEEVENTF_RIGHTUP
-        elif button == "middle":
-            down_flag = MOUSEEVENTF_MIDDLEDOWN
-            up_flag = MOUSEEVENTF_MIDDLEUP
-        else:
+    def _fill_click(self, start: int, button: str, double: bool) -> int:
+        """Fill down/up slots (twice for a double click) from slot start, return the slot count used"""
+        if button not in BUTTON_FLAGS:
             logger.error(f"Unknown button: {button}")
-            return
-            
-        # Prepare input structures
-        extra = ctypes.c_ulong(0)
-        ii_down = INPUT_UNION()
-        ii_down.mi = MOUSEINPUT(0, 0, 0, down_flag, 0, ctypes.pointer(extra))
-        command_down = INPUT(INPUT_MOUSE, ii_down)
+            return 0
         
-        ii_up = INPUT_UNION()
-        ii_up.mi = MOUSEINPUT(0, 0, 0, up_flag, 0, ctypes.pointer(extra))
-        command_up = INPUT(INPUT_MOUSE, ii_up)
+        flags = BUTTON_FLAGS[button] * (2 if double else 1)
+        for idx, flag in enumerate(flags, start):
+            self._fill_mouse(idx, 0, 0, flag)
+        return len(flags)
         
-        # Send input
-        self.user32.SendInput(1, ctypes.byref(command_down), ctypes.sizeof(command_down))
-        time.sleep(0.05)
-        self.user32.SendInput(1, ctypes.byref(command_up), ctypes.sizeof(command_up))
+    def mouse_click(self, button: str = "left", double: bool = False):
+        """Perform mouse click"""
+        count = self._fill_click(0, button, double)
+        if not count:
+            return
         
-        if double:
-            time.sleep(0.1)
-            self.user32.SendInput(1, ctypes.byref(command_down), ctypes.sizeof(command_down))
-            time.sleep(0.05)
-            self.user32.SendInput(1, ctypes.byref(command_up), ctypes.sizeof(command_up))
+        # Send all events in one call; the OS queues them in order, so no sleeps are needed
+        _SendInput(count, self._inputs, ctypes.sizeof(INPUT))
             
         logger.debug(f"Mouse {button} {'double ' if double else ''}click")
         
     def click_at_position(self, x: int, y: int, button: str = "left", double: bool = False):
         """Move cursor to position and click"""
-        self.set_cursor_position(x, y)
-        time.sleep(0.1)  # Small delay to ensure position is set
-        self.mouse_click(button, double)
+        count = self._fill_click(1, button, double)
+        if not count:
+            return
+        
+        # Move and click in one SendInput call; the click is processed after the move, so no delay is needed
+        self._fill_mouse(0, int(x * self._kx), int(y * self._ky), MOUSEEVENTF_MOVE | MOUSEEVENTF_ABSOLUTE)
+        _SendInput(count + 1, self._inputs, ctypes.sizeof(INPUT))
+        logger.debug(f"Mouse {button} {'double ' if double else ''}click at ({x}, {y})")
         
     def click_element(self, element, button: str = "left", double: bool = False):
         """Click on a UI element"""
@@ -199,12 +230,20 @@ class InputController:
     def activate_window(self, hwnd: int) -> bool:
         """Bring window to foreground"""
         try:
-            if win32gui.IsIconic(hwnd):  # If minimized
-                win32gui.ShowWindow(hwnd, win32con.SW_RESTORE)
+            # Already active: nothing to restore or wait for
+            if _GetForegroundWindow() == hwnd and not _IsIconic(hwnd):
+                return True
+            
+            if _IsIconic(hwnd):  # If minimized
+                _ShowWindow(hwnd, win32con.SW_RESTORE)
                 
             # Try to bring to foreground
-            result = win32gui.SetForegroundWindow(hwnd)
-            time.sleep(0.1)  # Give time for window to activate
+            result = _SetForegroundWindow(hwnd)
+            
+            # Wait up to 100ms for the switch instead of always sleeping 100ms
+            deadline = time.monotonic() + 0.1
+            while _GetForegroundWindow() != hwnd and time.monotonic() < deadline:
+                time.sleep(0.005)
             return result != 0
         except Exception as e:
             logger.error(f"Failed to activate window: {e}")
@@ -216,12 +255,11 @@ class InputController:
         if key_up:
             flags |= KEYEVENTF_KEYUP
             
-        extra = ctypes.c_ulong(0)
         ii = INPUT_UNION()
-        ii.ki = KEYBDINPUT(key_code, 0, flags, 0, ctypes.pointer(extra))
+        ii.ki = KEYBDINPUT(key_code, 0, flags, 0, _EXTRA_PTR)
         command = INPUT(INPUT_KEYBOARD, ii)
         
-        self.user32.SendInput(1, ctypes.byref(command), ctypes.sizeof(command))
+        _SendInput(1, ctypes.byref(command), ctypes.sizeof(command))
             
     def press_key(self, key: str):
         """Press and release a key"""
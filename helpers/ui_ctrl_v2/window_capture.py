@@ -22,10 +22,12 @@ class WindowCapture:
         
     def find_window(self, window_title: str) -> bool:
         """Find window by title and store its handle"""
+        title_lower = window_title.lower()
+        
         def callback(hwnd, ctx):
             if win32gui.IsWindowVisible(hwnd):
                 title = win32gui.GetWindowText(hwnd)
-                if window_title.lower() in title.lower():
+                if title_lower in title.lower():
                     ctx.append(hwnd)
             return True
         